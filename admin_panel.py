@@ -11,48 +11,159 @@ Features:
   - Does NOT allow changing Flask port (requires restart)
 """
 
+import base64
+import copy
 import json
 import os
+import re
 import hashlib
+import hmac
 import secrets
-from functools import wraps
-from flask import Blueprint, render_template_string, request, redirect, url_for, session, flash
+import string
+import tempfile
+import threading
+import time
+from functools import lru_cache, wraps
+from urllib.parse import quote
+from flask import (Blueprint, Response, after_this_request, current_app, get_flashed_messages,
+                   render_template, request, redirect, stream_with_context, url_for, session, flash, g)
+from jinja2 import FileSystemBytecodeCache
+from jinja2.ext import Extension
+from markupsafe import Markup, escape
 
 # Try to import 2FA dependencies
 try:
     import pyotp
     import qrcode
-    from io import BytesIO
-    import base64
+    from qrcode.image.svg import SvgPathImage
     TOTP_AVAILABLE = True
 except ImportError:
     TOTP_AVAILABLE = False
 
-# Create Blueprint for admin routes
-admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+# Try to import orjson for faster config parsing/serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try to import bcrypt for salted password hashing
+try:
+    import bcrypt
+    BCRYPT_AVAILABLE = True
+except ImportError:
+    BCRYPT_AVAILABLE = False
+
+# Try to import argon2-cffi for Argon2id password hashing (preferred over bcrypt)
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
+# Create Blueprint for admin routes (shared CSS/JS is served from ./static)
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin',
+                     static_folder='static', template_folder='templates')
 
 # Configuration files
 CONFIG_FILE = "WOL_Brige.config"
 ADMIN_CONFIG_FILE = "admin_config.json"
 
-# Session secret key - should be generated on first run
-SECRET_KEY = secrets.token_hex(32)
+# MAC address as XX:XX:XX:XX:XX:XX or XX-XX-XX-XX-XX-XX (same as the form's pattern)
+MAC_ADDRESS_RE = re.compile(r'^([0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}$')
+
+# Parsed config files cached in-process, keyed by file mtime so that
+# edits made outside the admin panel are still picked up. Callers always
+# get a deep copy, so an edit that fails to save never reaches the cache.
+# Each entry is an (mtime, data) tuple replaced in a single assignment, so
+# a reader never pairs a new mtime with old data.
+_admin_cfg_cache = {"entry": None}
+_server_cfg_cache = {"entry": None}
+
+# Held around load-edit-save sequences so concurrent requests don't
+# overwrite each other's changes
+_config_lock = threading.RLock()
+
+
+# Content hashes of static assets, used to fingerprint their URLs,
+# keyed by filename and re-hashed when the file's mtime changes
+_asset_versions = {}
+
+# Login rate limiting: max attempts per client IP within the window (seconds)
+LOGIN_RATE_LIMIT = 10
+LOGIN_RATE_WINDOW = 60
+_login_attempts = {}
+_login_attempts_lock = threading.Lock()
+
+
+def _file_mtime(path):
+    """Return the file's modification time in nanoseconds, or None if missing."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def config_loads(data):
+    """Parse JSON config bytes (orjson if available, else stdlib json)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def config_dumps(config):
+    """Serialize a config dict to pretty-printed JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    return json.dumps(config, indent=2, ensure_ascii=False).encode()
+
+
+def _index_admin_config(config):
+    """Attach derived lookup tables to a parsed admin config (not persisted)."""
+    config["_users_by_name"] = {u["username"]: u for u in config.get("users", [])}
+    return config
+
+
+def _cached_config(cache, mtime):
+    """Return a copy of the cached config if it was read at this mtime, else None."""
+    entry = cache["entry"]
+    if mtime is None or entry is None or entry[0] != mtime:
+        return None
+    return copy.deepcopy(entry[1])
 
 
 def load_admin_config():
     """Load admin configuration from file."""
-    if not os.path.exists(ADMIN_CONFIG_FILE):
+    config = _cached_config(_admin_cfg_cache, _file_mtime(ADMIN_CONFIG_FILE))
+    if config is not None:
+        return config
+    
+    # Creating or migrating the file saves it, so don't race another request;
+    # check again once the lock is held in case it just did the work
+    with _config_lock:
+        mtime = _file_mtime(ADMIN_CONFIG_FILE)
+        config = _cached_config(_admin_cfg_cache, mtime)
+        if config is not None:
+            return config
+        return _read_admin_config(mtime)
+
+
+def _read_admin_config(mtime):
+    """Read, migrate and cache the admin config file (called with _config_lock held)."""
+    if mtime is None:
         # Create default config with users array
         default_config = {
             "admin_enabled": False,
-            "users": []
+            "users": [],
+            "secret_key": secrets.token_hex(32)
         }
         save_admin_config(default_config)
         return default_config
     
     try:
-        with open(ADMIN_CONFIG_FILE, 'r') as f:
-            config = json.load(f)
+        with open(ADMIN_CONFIG_FILE, 'rb') as f:
+            config = config_loads(f.read())
             
             # Migrate old single-user format to new multi-user format
             if 'admin_username' in config and 'users' not in config:
@@ -64,39 +175,387 @@ def load_admin_config():
                 }
                 config = {
                     "admin_enabled": config.get('admin_enabled', False),
-                    "users": [old_user] if old_user['password_hash'] else []
+                    "users": [old_user] if old_user['password_hash'] else [],
+                    "secret_key": secrets.token_hex(32)
                 }
                 save_admin_config(config)
+                return config
             
-            return config
+            # Session secret key - generated on first run and kept so that
+            # sessions stay valid across restarts and multiple workers
+            if not config.get('secret_key'):
+                config['secret_key'] = secrets.token_hex(32)
+                save_admin_config(config)
+                return config
+            
+            _admin_cfg_cache["entry"] = (mtime, _index_admin_config(config))
+            return copy.deepcopy(config)
     except:
-        return {
+        return _index_admin_config({
             "admin_enabled": False,
             "users": []
-        }
+        })
+
+
+def write_config_atomic(path, config):
+    """Write a config dict as JSON via a temp file so readers never see a partial file."""
+    # Serialize up front so the file is written with a single write() call
+    data = config_dumps(config)
+    directory = os.path.dirname(os.path.abspath(path))
+    f = tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.tmp', delete=False)
+    tmp_path = f.name
+    try:
+        with f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        # Don't leave the temp file behind (e.g. disk full)
+        os.remove(tmp_path)
+        raise
+    try:
+        # Keep the original file's permissions (temp files are created 0600)
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Bind-mounted files (e.g. Docker volumes) cannot be replaced; write in place
+        os.remove(tmp_path)
+        with open(path, 'wb') as f:
+            f.write(data)
 
 
 def save_admin_config(config):
     """Save admin configuration to file."""
-    with open(ADMIN_CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=4)
+    # Derived "_" keys are rebuilt on load and never written to disk
+    data = {k: v for k, v in config.items() if not k.startswith('_')}
+    write_config_atomic(ADMIN_CONFIG_FILE, data)
+    
+    # Only cache once the write succeeded, and keep the caller's dict separate
+    _index_admin_config(config)
+    _admin_cfg_cache["entry"] = (_file_mtime(ADMIN_CONFIG_FILE), copy.deepcopy(config))
+
+
+def update_admin_user(username, changes):
+    """Apply field changes to one user in the admin config and save it."""
+    with _config_lock:
+        admin_config = load_admin_config()
+        user = admin_config['_users_by_name'].get(username)
+        if user is None:
+            return False
+        user.update(changes)
+        save_admin_config(admin_config)
+        return True
+
+
+def load_server_config():
+    """Load the server configuration (WOL_Brige.config) from file."""
+    mtime = _file_mtime(CONFIG_FILE)
+    config = _cached_config(_server_cfg_cache, mtime)
+    if config is not None:
+        return config
+    
+    # Keyed on the mtime seen before reading, so a change made while
+    # reading just causes another read next time
+    with open(CONFIG_FILE, 'rb') as f:
+        config = config_loads(f.read())
+    
+    _server_cfg_cache["entry"] = (mtime, config)
+    return copy.deepcopy(config)
+
+
+def save_server_config(config):
+    """Save the server configuration (WOL_Brige.config) to file."""
+    write_config_atomic(CONFIG_FILE, config)
+    
+    # Only cache once the write succeeded, and keep the caller's dict separate
+    _server_cfg_cache["entry"] = (_file_mtime(CONFIG_FILE), copy.deepcopy(config))
+
+
+# Whitespace runs in template source, and blocks whose whitespace must be kept
+_WHITESPACE_RE = re.compile(r'\s+')
+_PRESERVE_WHITESPACE_RE = re.compile(r'<(pre|textarea)\b.*?</\1>', re.S | re.I)
+
+
+class CollapseWhitespace(Extension):
+    """Collapse whitespace runs in admin template source before it is compiled."""
+
+    def preprocess(self, source, name, filename=None):
+        if not name or not name.startswith('admin/'):
+            return source
+        parts = []
+        pos = 0
+        for match in _PRESERVE_WHITESPACE_RE.finditer(source):
+            parts.append(_WHITESPACE_RE.sub(' ', source[pos:match.start()]))
+            parts.append(match.group(0))
+            pos = match.end()
+        parts.append(_WHITESPACE_RE.sub(' ', source[pos:]))
+        return ''.join(parts)
+
+
+ADMIN_TEMPLATES = ('base.html', 'login.html', 'verify_2fa.html',
+                   'initial_2fa_setup.html', 'dashboard.html', 'server_form.html',
+                   'security.html', 'setup_2fa.html', 'users.html', 'user_form.html')
+
+
+@admin_bp.record_once
+def precompile_templates(state):
+    """Load all admin templates into the app's Jinja cache when the blueprint is registered."""
+    env = state.app.jinja_env
+    env.trim_blocks = True
+    env.lstrip_blocks = True
+    env.add_extension(CollapseWhitespace)
+    if env.bytecode_cache is None:
+        # Share compiled templates on disk so restarts and extra workers skip the parse.
+        # The cache is keyed on raw source only, so bump the prefix whenever the
+        # environment options or preprocessing above change
+        cache_dir = os.environ.get('JINJA_CACHE_DIR')
+        try:
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+                if not os.access(cache_dir, os.W_OK | os.X_OK):
+                    raise PermissionError(f"{cache_dir} is not writable")
+            env.bytecode_cache = FileSystemBytecodeCache(cache_dir, '__wol_admin_v1_%s.cache')
+        except (OSError, RuntimeError) as e:
+            # The cache only saves startup time; run without it rather than
+            # failing to register the admin panel
+            print(f"[{time.strftime('%H:%M:%S')}] Admin template cache disabled: {e}")
+    for name in ADMIN_TEMPLATES:
+        env.get_template('admin/' + name)
+
+
+def stream_admin_template(template_name, **context):
+    """Render an admin template as a streamed response."""
+    template = current_app.jinja_env.get_template(template_name)
+    current_app.update_template_context(context)
+    return Response(stream_with_context(template.generate(context)), mimetype='text/html')
+
+
+# One row of the dashboard server table; Markup.format escapes every field
+_SERVER_ROW_HTML = Markup(
+    '<tr><td>{idx}</td><td><strong>{name}</strong></td><td><code>{mac}</code></td>'
+    '<td>{broadcast}</td><td>{site_url}</td><td>{wait}s</td><td>{status}</td>'
+    '<td><div class="actions"><a href="{edit_url}" class="btn btn-edit">Edit</a> '
+    '<form method="POST" action="{delete_url}" style="display: inline;" '
+    'data-confirm="Are you sure you want to delete {name}?">'
+    '<button type="submit" class="btn btn-delete">Delete</button></form></div></td></tr>'
+)
+_LOCKED_HTML = Markup('<span style="color: #e74c3c;"><i class="fas fa-lock"></i> Locked</span>')
+_OPEN_HTML = Markup('<span style="color: #27ae60;"><i class="fas fa-lock-open"></i> Open</span>')
+
+
+def render_server_rows(servers):
+    """Render the dashboard table rows in Python rather than in a Jinja loop."""
+    # Build the URL prefixes once; server_id is an int, so appending it is safe
+    edit_base = url_for('admin.edit_server', server_id=0).rsplit('/', 1)[0] + '/'
+    delete_base = url_for('admin.delete_server', server_id=0).rsplit('/', 1)[0] + '/'
+    return Markup('').join(
+        _SERVER_ROW_HTML.format(
+            idx=idx,
+            name=escape(server.get('NAME', '')),  # used twice per row, escape it once
+            mac=server.get('WOL_MAC_ADDRESS', ''),
+            broadcast=server.get('BROADCAST_ADDRESS', ''),
+            site_url=server.get('SITE_URL', ''),
+            wait=server.get('WAIT_TIME_SECONDS', ''),
+            status=_LOCKED_HTML if server.get('locked', False) else _OPEN_HTML,
+            edit_url=edit_base + str(idx),
+            delete_url=delete_base + str(idx),
+        )
+        for idx, server in enumerate(servers)
+    )
+
+
+# One row of the user management table, plus its optional pieces
+_USER_ROW_HTML = Markup(
+    '<tr><td><strong>{name}</strong>{you}</td><td>{two_fa}</td>'
+    '<td><div class="actions"><a href="{edit_url}" class="btn btn-edit">Edit</a> {delete}</div></td></tr>'
+)
+_USER_DELETE_HTML = Markup(
+    '<form method="POST" action="{delete_url}" style="display: inline;" '
+    'data-confirm="Are you sure you want to delete {name}?">'
+    '<button type="submit" class="btn btn-delete">Delete</button></form>'
+)
+_YOU_BADGE_HTML = Markup(' <span class="badge badge-success">You</span>')
+_2FA_ENABLED_HTML = Markup('<span class="badge badge-success"><i class="fas fa-check"></i> Enabled</span>')
+_2FA_DISABLED_HTML = Markup('<span class="badge badge-secondary">Disabled</span>')
+
+
+def render_user_rows(users, current_user):
+    """Render the user management table rows in Python rather than in a Jinja loop."""
+    edit_base = url_for('admin.edit_user', username='_').rsplit('/', 1)[0] + '/'
+    delete_base = url_for('admin.delete_user', username='_').rsplit('/', 1)[0] + '/'
+    rows = []
+    for user in users:
+        username = user['username']
+        name = escape(username)
+        path = quote(username, safe='')
+        is_current = username == current_user
+        rows.append(_USER_ROW_HTML.format(
+            name=name,
+            you=_YOU_BADGE_HTML if is_current else '',
+            two_fa=_2FA_ENABLED_HTML if user.get('2fa_enabled') else _2FA_DISABLED_HTML,
+            edit_url=edit_base + path,
+            delete='' if is_current else _USER_DELETE_HTML.format(delete_url=delete_base + path, name=name),
+        ))
+    return Markup('').join(rows)
+
+
+def _asset_version(filename):
+    """Content hash of an admin static file, or None if it doesn't exist."""
+    path = os.path.join(admin_bp.static_folder, filename)
+    mtime = _file_mtime(path)
+    if mtime is None:
+        return None
+    cached = _asset_versions.get(filename)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = (mtime, hashlib.sha256(f.read()).hexdigest()[:8])
+        _asset_versions[filename] = cached
+    return cached[1]
+
+
+@admin_bp.app_template_global()
+def admin_asset_url(filename):
+    """URL for an admin static file, fingerprinted with its content hash."""
+    return url_for('admin.static', filename=filename, v=_asset_version(filename))
+
+
+@admin_bp.after_request
+def cache_static_assets(response):
+    """Let browsers cache fingerprinted static assets for a year."""
+    if request.endpoint == 'admin.static' and response.status_code == 200:
+        # Only the current fingerprint is immutable; a stale ?v= must revalidate
+        version = request.args.get('v')
+        if version and version == _asset_version(request.view_args['filename']):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def login_rate_limited(client_ip):
+    """Record a login attempt and return True if the client is over the limit."""
+    now = time.monotonic()
+    with _login_attempts_lock:
+        # Drop stale entries so the table can't grow without bound
+        if len(_login_attempts) > 1024:
+            for ip in [ip for ip, times in _login_attempts.items()
+                       if now - times[-1] >= LOGIN_RATE_WINDOW]:
+                del _login_attempts[ip]
+        
+        attempts = [t for t in _login_attempts.get(client_ip, []) if now - t < LOGIN_RATE_WINDOW]
+        limited = len(attempts) >= LOGIN_RATE_LIMIT
+        if not limited:
+            attempts.append(now)
+        _login_attempts[client_ip] = attempts
+        return limited
+
+
+@lru_cache(maxsize=32)
+def get_totp(secret):
+    """Return a TOTP object for a secret, reusing it across verifications."""
+    return pyotp.TOTP(secret)
+
+
+# Argon2id parameters for new hashes; stored hashes made with other
+# parameters are upgraded on the next login
+ARGON2_PARAMS = {"time_cost": 2, "memory_cost": 65536, "parallelism": 2}
+
+_password_hasher = None
+if ARGON2_AVAILABLE:
+    _password_hasher = PasswordHasher(**ARGON2_PARAMS)
+
+
+def is_legacy_hash(password_hash):
+    """Check if a stored hash is an old unsalted SHA-256 hex digest."""
+    return len(password_hash) == 64 and all(c in string.hexdigits for c in password_hash)
+
+
+# bcrypt only looks at the first 72 bytes of a password, and bcrypt 5 rejects
+# anything longer, so longer passwords are pre-hashed before bcrypt sees them
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+def _bcrypt_password(password):
+    """Password bytes to pass to bcrypt (base64 SHA-256 digest if too long)."""
+    data = password.encode()
+    if len(data) > BCRYPT_MAX_PASSWORD_BYTES:
+        return base64.b64encode(hashlib.sha256(data).digest())
+    return data
 
 
 def hash_password(password):
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password using Argon2id (falls back to bcrypt, then SHA-256)."""
+    if ARGON2_AVAILABLE:
+        return _password_hasher.hash(password)
+    if not BCRYPT_AVAILABLE:
+        return hashlib.sha256(password.encode()).hexdigest()
+    return bcrypt.hashpw(_bcrypt_password(password), bcrypt.gensalt(rounds=12)).decode()
 
 
 def verify_password(password, password_hash):
-    """Verify a password against its hash."""
-    return hash_password(password) == password_hash
+    """Verify a password against its hash (Argon2id, bcrypt or legacy SHA-256)."""
+    if not password_hash:
+        return False
+    if is_legacy_hash(password_hash):
+        # Constant-time compare so the check doesn't leak how much of the hash matched
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+    if password_hash.startswith('$argon2'):
+        if not ARGON2_AVAILABLE:
+            return False
+        try:
+            return _password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    if not BCRYPT_AVAILABLE:
+        return False
+    try:
+        if bcrypt.checkpw(_bcrypt_password(password), password_hash.encode()):
+            return True
+        # Hashes made by bcrypt < 5 silently used only the first 72 bytes
+        data = password.encode()
+        return (len(data) > BCRYPT_MAX_PASSWORD_BYTES
+                and bcrypt.checkpw(data[:BCRYPT_MAX_PASSWORD_BYTES], password_hash.encode()))
+    except ValueError:
+        # Malformed hash in config file
+        return False
+
+
+# Checked against when a username doesn't exist, so a failed login costs
+# the same hashing work either way and doesn't reveal which users exist
+_DUMMY_PASSWORD_HASH = hash_password(secrets.token_urlsafe(16))
+
+
+def authenticate_user(admin_config, username, password):
+    """Return the user if the username and password match, otherwise None."""
+    user = admin_config['_users_by_name'].get(username)
+    if user is None:
+        verify_password(password, _DUMMY_PASSWORD_HASH)
+        return None
+    if not verify_password(password, user['password_hash']):
+        return None
+    return user
+
+
+def password_needs_rehash(password_hash):
+    """Check if a stored hash is weaker than what hash_password() would produce now."""
+    if ARGON2_AVAILABLE:
+        if not password_hash.startswith('$argon2'):
+            return True
+        return _password_hasher.check_needs_rehash(password_hash)
+    return BCRYPT_AVAILABLE and is_legacy_hash(password_hash)
+
+
+@admin_bp.before_request
+def load_request_admin_config():
+    """Load the admin config once per request for the guard and the view to share."""
+    if request.endpoint != 'admin.static':
+        g.admin_config = load_admin_config()
 
 
 def login_required(f):
     """Decorator to require admin login."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        admin_config = load_admin_config()
+        admin_config = g.admin_config
         
         # If admin panel is disabled, show error
         if not admin_config.get('admin_enabled', False):
@@ -113,24 +572,29 @@ def login_required(f):
 @admin_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """Admin login page."""
-    admin_config = load_admin_config()
+    admin_config = g.admin_config
     
     # If admin panel is disabled, show error
     if not admin_config.get('admin_enabled', False):
         return "Admin panel is disabled. Enable it using setup_wol.py", 403
     
     if request.method == 'POST':
+        # Check the rate limit before doing any (deliberately slow) password hashing
+        if login_rate_limited(request.remote_addr):
+            error = "Too many login attempts. Please wait a minute and try again."
+            return render_template('admin/login.html', error=error,
+                                   require_2fa=False), 429
+        
         username = request.form.get('username', '')
         password = request.form.get('password', '')
         
-        # Find user in users array
-        user = None
-        for u in admin_config.get('users', []):
-            if u['username'] == username and verify_password(password, u['password_hash']):
-                user = u
-                break
+        user = authenticate_user(admin_config, username, password)
         
         if user:
+            # Upgrade older hashes (SHA-256, bcrypt) now that we know the password
+            if password_needs_rehash(user['password_hash']):
+                update_admin_user(username, {'password_hash': hash_password(password)})
+            
             # Check if 2FA is enabled for this user
             if user.get('2fa_enabled', False):
                 # Check if 2FA setup is complete
@@ -150,11 +614,11 @@ def login():
             return redirect(url_for('admin.dashboard'))
         else:
             error = "Invalid username or password"
-            return render_template_string(LOGIN_TEMPLATE, error=error,
-                                         require_2fa=False)
+            return render_template('admin/login.html', error=error,
+                                   require_2fa=False)
     
     # Initial GET request
-    return render_template_string(LOGIN_TEMPLATE, error=None, require_2fa=False)
+    return render_template('admin/login.html', error=None, require_2fa=False)
 
 
 @admin_bp.route('/verify-2fa', methods=['GET', 'POST'])
@@ -165,8 +629,8 @@ def verify_2fa():
     if not username:
         return redirect(url_for('admin.login'))
     
-    admin_config = load_admin_config()
-    user = next((u for u in admin_config.get('users', []) if u['username'] == username), None)
+    admin_config = g.admin_config
+    user = admin_config['_users_by_name'].get(username)
     
     if not user or not user.get('2fa_enabled', False):
         session.pop('pending_2fa_username', None)
@@ -176,7 +640,7 @@ def verify_2fa():
         totp_code = request.form.get('totp_code', '')
         
         if TOTP_AVAILABLE:
-            totp = pyotp.TOTP(user['2fa_secret'])
+            totp = get_totp(user['2fa_secret'])
             if totp.verify(totp_code, valid_window=1):
                 # 2FA verification successful
                 session.pop('pending_2fa_username', None)
@@ -186,10 +650,10 @@ def verify_2fa():
                 return redirect(url_for('admin.dashboard'))
         
         error = "Invalid 2FA code. Please try again."
-        return render_template_string(VERIFY_2FA_TEMPLATE, error=error, username=username)
+        return render_template('admin/verify_2fa.html', error=error, username=username)
     
     # Show 2FA verification form
-    return render_template_string(VERIFY_2FA_TEMPLATE, error=None, username=username)
+    return render_template('admin/verify_2fa.html', error=None, username=username)
 
 
 @admin_bp.route('/setup-2fa-initial', methods=['GET', 'POST'])
@@ -200,9 +664,8 @@ def setup_2fa_initial():
     if not username:
         return redirect(url_for('admin.login'))
     
-    admin_config = load_admin_config()
-    users = admin_config.get('users', [])
-    user = next((u for u in users if u['username'] == username), None)
+    admin_config = g.admin_config
+    user = admin_config['_users_by_name'].get(username)
     
     if not user or not user.get('2fa_enabled', False) or user.get('2fa_setup_complete', False):
         session.pop('pending_2fa_setup_username', None)
@@ -212,11 +675,10 @@ def setup_2fa_initial():
         totp_code = request.form.get('totp_code', '')
         
         if TOTP_AVAILABLE and user.get('2fa_secret'):
-            totp = pyotp.TOTP(user['2fa_secret'])
+            totp = get_totp(user['2fa_secret'])
             if totp.verify(totp_code, valid_window=1):
                 # 2FA setup complete
-                user['2fa_setup_complete'] = True
-                save_admin_config(admin_config)
+                update_admin_user(username, {'2fa_setup_complete': True})
                 
                 # Log the user in
                 session.pop('pending_2fa_setup_username', None)
@@ -228,23 +690,23 @@ def setup_2fa_initial():
         
         error = "Invalid 2FA code. Please try again."
         secret = user.get('2fa_secret', '')
-        qr_code = generate_qr_code(pyotp.TOTP(secret).provisioning_uri(name=username, issuer_name="WOL Gateway")) if secret else ''
-        return render_template_string(INITIAL_2FA_SETUP_TEMPLATE, error=error, username=username, secret=secret, qr_code=qr_code)
+        qr_code = generate_qr_code(get_totp(secret).provisioning_uri(name=username, issuer_name="WOL Gateway")) if secret else ''
+        return render_template('admin/initial_2fa_setup.html', error=error, username=username, secret=secret, qr_code=qr_code)
     
     # Generate 2FA secret if not already set
     if not user.get('2fa_secret'):
         user['2fa_secret'] = pyotp.random_base32() if TOTP_AVAILABLE else ''
-        save_admin_config(admin_config)
+        update_admin_user(username, {'2fa_secret': user['2fa_secret']})
     
     # Show 2FA setup form with QR code
     secret = user.get('2fa_secret', '')
     qr_code = ''
     if TOTP_AVAILABLE and secret:
-        totp = pyotp.TOTP(secret)
+        totp = get_totp(secret)
         provisioning_uri = totp.provisioning_uri(name=username, issuer_name="WOL Gateway")
         qr_code = generate_qr_code(provisioning_uri)
     
-    return render_template_string(INITIAL_2FA_SETUP_TEMPLATE, error=None, username=username, secret=secret, qr_code=qr_code)
+    return render_template('admin/initial_2fa_setup.html', error=None, username=username, secret=secret, qr_code=qr_code)
 
 
 @admin_bp.route('/logout')
@@ -259,20 +721,22 @@ def logout():
 @login_required
 def dashboard():
     """Main admin dashboard."""
-    # Load current configuration
-    if not os.path.exists(CONFIG_FILE):
-        return "Configuration file not found. Run setup_wol.py first.", 500
-    
+    # Load current configuration (served from the in-process cache unless the file changed)
     try:
-        with open(CONFIG_FILE, 'r') as f:
-            config = json.load(f)
+        config = load_server_config()
+    except FileNotFoundError:
+        return "Configuration file not found. Run setup_wol.py first.", 500
     except:
         return "Error loading configuration file.", 500
     
     servers = config.get('SERVERS', [])
     port = config.get('PORT', 5000)
     
-    return render_template_string(DASHBOARD_TEMPLATE, servers=servers, port=port)
+    # Flashes are popped here, before streaming starts, since the session
+    # cookie is sent ahead of the body
+    return stream_admin_template('admin/dashboard.html', servers=servers,
+                                 server_rows=render_server_rows(servers), port=port,
+                                 flashes=get_flashed_messages(with_categories=True))
 
 
 @admin_bp.route('/server/add', methods=['GET', 'POST'])
@@ -280,10 +744,6 @@ def dashboard():
 def add_server():
     """Add a new server."""
     if request.method == 'POST':
-        # Load current config
-        with open(CONFIG_FILE, 'r') as f:
-            config = json.load(f)
-        
         # Get locked status and PIN
         is_locked = request.form.get('locked') == 'on'
         pin = request.form.get('pin', '').strip()
@@ -309,17 +769,21 @@ def add_server():
             except ValueError:
                 new_server["CHECK_PORT"] = 22
         
-        # Add to servers list
-        config['SERVERS'].append(new_server)
+        if not MAC_ADDRESS_RE.match(new_server["WOL_MAC_ADDRESS"]):
+            flash('Invalid MAC address. Use the format XX:XX:XX:XX:XX:XX', 'error')
+            return render_template('admin/server_form.html', server=new_server, action='Add',
+                                   flashes=get_flashed_messages(with_categories=True))
         
-        # Save config
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        # Add to servers list and save, on a fresh copy of the config
+        with _config_lock:
+            config = load_server_config()
+            config['SERVERS'].append(new_server)
+            save_server_config(config)
         
         flash('Server added successfully! Restart the application for changes to take effect.', 'success')
         return redirect(url_for('admin.dashboard'))
     
-    return render_template_string(SERVER_FORM_TEMPLATE, server=None, action='Add')
+    return render_template('admin/server_form.html', server=None, action='Add')
 
 
 @admin_bp.route('/server/edit/<int:server_id>', methods=['GET', 'POST'])
@@ -327,8 +791,7 @@ def add_server():
 def edit_server(server_id):
     """Edit an existing server."""
     # Load current config
-    with open(CONFIG_FILE, 'r') as f:
-        config = json.load(f)
+    config = load_server_config()
     
     servers = config.get('SERVERS', [])
     
@@ -342,7 +805,7 @@ def edit_server(server_id):
         ip_address = request.form.get('ip_address', '').strip()
         check_port = request.form.get('check_port', '22').strip()
         
-        servers[server_id] = {
+        updated_server = {
             "NAME": request.form.get('name', '').strip(),
             "WOL_MAC_ADDRESS": request.form.get('mac', '').strip(),
             "BROADCAST_ADDRESS": request.form.get('broadcast', '255.255.255.255').strip(),
@@ -354,44 +817,55 @@ def edit_server(server_id):
         
         # Only add IP address and port if provided
         if ip_address:
-            servers[server_id]["IP_ADDRESS"] = ip_address
+            updated_server["IP_ADDRESS"] = ip_address
             try:
-                servers[server_id]["CHECK_PORT"] = int(check_port)
+                updated_server["CHECK_PORT"] = int(check_port)
             except ValueError:
-                servers[server_id]["CHECK_PORT"] = 22
+                updated_server["CHECK_PORT"] = 22
         
-        # Save config
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        # Validate before touching the config
+        if not MAC_ADDRESS_RE.match(updated_server["WOL_MAC_ADDRESS"]):
+            flash('Invalid MAC address. Use the format XX:XX:XX:XX:XX:XX', 'error')
+            return render_template('admin/server_form.html', server=updated_server, action='Edit',
+                                   server_id=server_id,
+                                   flashes=get_flashed_messages(with_categories=True))
+        
+        # Save on a fresh copy of the config; the server may have been deleted meanwhile
+        with _config_lock:
+            config = load_server_config()
+            servers = config.get('SERVERS', [])
+            if server_id >= len(servers):
+                return "Invalid server ID", 404
+            servers[server_id] = updated_server
+            save_server_config(config)
         
         flash('Server updated successfully! Restart the application for changes to take effect.', 'success')
         return redirect(url_for('admin.dashboard'))
     
     server = servers[server_id]
-    return render_template_string(SERVER_FORM_TEMPLATE, server=server, 
-                                 action='Edit', server_id=server_id)
+    return render_template('admin/server_form.html', server=server, 
+                           action='Edit', server_id=server_id)
 
 
 @admin_bp.route('/server/delete/<int:server_id>', methods=['POST'])
 @login_required
 def delete_server(server_id):
     """Delete a server."""
-    # Load current config
-    with open(CONFIG_FILE, 'r') as f:
-        config = json.load(f)
-    
-    servers = config.get('SERVERS', [])
-    
-    if server_id < 0 or server_id >= len(servers):
-        return "Invalid server ID", 404
-    
-    # Remove server
-    deleted_name = servers[server_id]['NAME']
-    servers.pop(server_id)
-    
-    # Save config
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=4)
+    with _config_lock:
+        # Load current config
+        config = load_server_config()
+        
+        servers = config.get('SERVERS', [])
+        
+        if server_id < 0 or server_id >= len(servers):
+            return "Invalid server ID", 404
+        
+        # Remove server
+        deleted_name = servers[server_id]['NAME']
+        servers.pop(server_id)
+        
+        # Save config
+        save_server_config(config)
     
     flash(f'Server "{deleted_name}" deleted successfully! Restart the application for changes to take effect.', 'success')
     return redirect(url_for('admin.dashboard'))
@@ -401,22 +875,13 @@ def delete_server(server_id):
 @login_required
 def restart_application():
     """Restart the Flask application."""
-    import sys
-    import os
-    
-    # Check if running in Docker
-    is_docker = os.path.exists('/.dockerenv')
-    
     flash('Restarting application... Please wait a few seconds and refresh the page.', 'success')
     
-    # Use a background thread to exit after sending the response
-    def exit_app():
-        import time
-        time.sleep(0.5)  # Give time for response to be sent
-        os._exit(0)  # Force exit (Docker will restart the container)
-    
-    import threading
-    threading.Thread(target=exit_app, daemon=True).start()
+    # Exit once the redirect has been fully sent (Docker will restart the container)
+    @after_this_request
+    def exit_after_response(response):
+        response.call_on_close(lambda: os._exit(0))
+        return response
     
     return redirect(url_for('admin.dashboard'))
 
@@ -425,11 +890,14 @@ def restart_application():
 @login_required
 def manage_users():
     """Manage admin users."""
-    admin_config = load_admin_config()
+    admin_config = g.admin_config
     users = admin_config.get('users', [])
     current_user = session.get('admin_username', '')
     
-    return render_template_string(USER_MANAGEMENT_TEMPLATE, users=users, current_user=current_user)
+    # Flashes are popped before streaming starts, as on the dashboard
+    return stream_admin_template('admin/users.html', users=users,
+                                 user_rows=render_user_rows(users, current_user),
+                                 flashes=get_flashed_messages(with_categories=True))
 
 
 @admin_bp.route('/users/add', methods=['GET', 'POST'])
@@ -437,95 +905,103 @@ def manage_users():
 def add_user():
     """Add a new admin user."""
     if request.method == 'POST':
-        username = request.form.get('username', '').strip()
-        password = request.form.get('password', '')
-        confirm_password = request.form.get('confirm_password', '')
-        enable_2fa = request.form.get('enable_2fa') == 'on'
+        form = request.form
+        username = form.get('username', '').strip()
+        password = form.get('password', '')
+        confirm_password = form.get('confirm_password', '')
+        enable_2fa = form.get('enable_2fa') == 'on'
         
-        # Validate
+        # Validate, collecting every problem so the form is rendered once
+        errors = []
         if not username:
-            flash('Username is required', 'error')
-            return render_template_string(USER_FORM_TEMPLATE, user=None, action='Add')
-        
+            errors.append('Username is required')
+        elif username in g.admin_config['_users_by_name']:
+            errors.append('Username already exists')
         if len(password) < 6:
-            flash('Password must be at least 6 characters', 'error')
-            return render_template_string(USER_FORM_TEMPLATE, user=None, action='Add')
-        
+            errors.append('Password must be at least 6 characters')
         if password != confirm_password:
-            flash('Passwords do not match', 'error')
-            return render_template_string(USER_FORM_TEMPLATE, user=None, action='Add')
-        
-        # Check if username already exists
-        admin_config = load_admin_config()
-        if any(u['username'] == username for u in admin_config.get('users', [])):
-            flash('Username already exists', 'error')
-            return render_template_string(USER_FORM_TEMPLATE, user=None, action='Add')
+            errors.append('Passwords do not match')
         
-        # Create new user
-        new_user = {
-            'username': username,
-            'password_hash': hash_password(password),
-            '2fa_enabled': enable_2fa,
-            '2fa_secret': '',
-            '2fa_setup_complete': False
-        }
+        if not errors:
+            # Hash before taking the lock so other requests don't wait on it
+            new_user = {
+                'username': username,
+                'password_hash': hash_password(password),
+                '2fa_enabled': enable_2fa,
+                '2fa_secret': '',
+                '2fa_setup_complete': False
+            }
+            
+            # Check the username again on a fresh copy under the lock, so two
+            # requests can't both add the same user
+            with _config_lock:
+                admin_config = load_admin_config()
+                if username in admin_config['_users_by_name']:
+                    errors.append('Username already exists')
+                else:
+                    admin_config['users'].append(new_user)
+                    save_admin_config(admin_config)
         
-        admin_config['users'].append(new_user)
-        save_admin_config(admin_config)
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+            return render_template('admin/user_form.html', user=None, action='Add',
+                                   flashes=get_flashed_messages(with_categories=True))
         
         flash(f'User "{username}" added successfully!', 'success')
         return redirect(url_for('admin.manage_users'))
     
-    return render_template_string(USER_FORM_TEMPLATE, user=None, action='Add')
+    return render_template('admin/user_form.html', user=None, action='Add',
+                           flashes=get_flashed_messages(with_categories=True))
 
 
 @admin_bp.route('/users/edit/<username>', methods=['GET', 'POST'])
 @login_required
 def edit_user(username):
     """Edit an admin user."""
-    admin_config = load_admin_config()
-    users = admin_config.get('users', [])
-    
-    # Find user
-    user_index = None
-    user = None
-    for i, u in enumerate(users):
-        if u['username'] == username:
-            user_index = i
-            user = u
-            break
+    admin_config = g.admin_config
+    user = admin_config['_users_by_name'].get(username)
     
     if user is None:
         flash('User not found', 'error')
         return redirect(url_for('admin.manage_users'))
     
     if request.method == 'POST':
-        password = request.form.get('password', '')
-        confirm_password = request.form.get('confirm_password', '')
-        enable_2fa = request.form.get('enable_2fa') == 'on'
+        form = request.form
+        password = form.get('password', '')
+        confirm_password = form.get('confirm_password', '')
+        enable_2fa = form.get('enable_2fa') == 'on'
+        changes = {}
         
         # Update password if provided
         if password:
+            errors = []
             if len(password) < 6:
-                flash('Password must be at least 6 characters', 'error')
-                return render_template_string(USER_FORM_TEMPLATE, user=user, action='Edit')
-            
+                errors.append('Password must be at least 6 characters')
             if password != confirm_password:
-                flash('Passwords do not match', 'error')
-                return render_template_string(USER_FORM_TEMPLATE, user=user, action='Edit')
+                errors.append('Passwords do not match')
+            
+            if errors:
+                for error in errors:
+                    flash(error, 'error')
+                return render_template('admin/user_form.html', user=user, action='Edit',
+                                       flashes=get_flashed_messages(with_categories=True))
             
-            users[user_index]['password_hash'] = hash_password(password)
+            changes['password_hash'] = hash_password(password)
         
         # Update 2FA
-        users[user_index]['2fa_enabled'] = enable_2fa
-        if enable_2fa and not users[user_index].get('2fa_secret'):
-            users[user_index]['2fa_secret'] = pyotp.random_base32()
+        changes['2fa_enabled'] = enable_2fa
+        if enable_2fa and not user.get('2fa_secret'):
+            changes['2fa_secret'] = pyotp.random_base32()
         
-        save_admin_config(admin_config)
+        if not update_admin_user(username, changes):
+            flash('User not found', 'error')
+            return redirect(url_for('admin.manage_users'))
         flash(f'User "{username}" updated successfully!', 'success')
         return redirect(url_for('admin.manage_users'))
     
-    return render_template_string(USER_FORM_TEMPLATE, user=user, action='Edit')
+    return render_template('admin/user_form.html', user=user, action='Edit',
+                           flashes=get_flashed_messages(with_categories=True))
 
 
 @admin_bp.route('/users/delete/<username>', methods=['POST'])
@@ -539,13 +1015,15 @@ def delete_user(username):
         flash('Cannot delete your own account', 'error')
         return redirect(url_for('admin.manage_users'))
     
-    admin_config = load_admin_config()
-    users = admin_config.get('users', [])
-    
-    # Find and remove user
-    admin_config['users'] = [u for u in users if u['username'] != username]
-    
-    save_admin_config(admin_config)
+    with _config_lock:
+        admin_config = load_admin_config()
+        
+        # Find and remove user
+        user = admin_config['_users_by_name'].get(username)
+        if user is not None:
+            admin_config['users'].remove(user)
+        
+        save_admin_config(admin_config)
     flash(f'User "{username}" deleted successfully!', 'success')
     return redirect(url_for('admin.manage_users'))
 
@@ -554,12 +1032,11 @@ def delete_user(username):
 @login_required
 def security_settings():
     """Security settings page."""
-    admin_config = load_admin_config()
+    admin_config = g.admin_config
     
     # Get current user from session
     current_username = session.get('admin_username')
-    users = admin_config.get('users', [])
-    current_user = next((u for u in users if u['username'] == current_username), None)
+    current_user = admin_config['_users_by_name'].get(current_username)
     
     if not current_user:
         flash('User not found', 'error')
@@ -574,48 +1051,47 @@ def security_settings():
             confirm_password = request.form.get('confirm_password', '')
             
             # Verify current password
-            if not verify_password(current_password, current_user['password_hash']):
+            if not authenticate_user(admin_config, current_username, current_password):
                 flash('Current password is incorrect', 'error')
             elif new_password != confirm_password:
                 flash('New passwords do not match', 'error')
             elif len(new_password) < 6:
                 flash('Password must be at least 6 characters', 'error')
             else:
-                current_user['password_hash'] = hash_password(new_password)
-                save_admin_config(admin_config)
+                update_admin_user(current_username, {'password_hash': hash_password(new_password)})
                 flash('Password changed successfully', 'success')
         
         elif action == 'enable_2fa':
             # Check if TOTP is available
             if not TOTP_AVAILABLE:
-                flash('2FA requires pyotp and qrcode packages. Install with: pip3 install pyotp qrcode pillow', 'error')
+                flash('2FA requires pyotp and qrcode packages. Install with: pip3 install pyotp qrcode', 'error')
                 return redirect(url_for('admin.security_settings'))
             
             # Generate new 2FA secret
             secret = pyotp.random_base32()
-            current_user['2fa_secret'] = secret
-            current_user['2fa_enabled'] = False  # Not enabled until verified
-            save_admin_config(admin_config)
+            update_admin_user(current_username, {
+                '2fa_secret': secret,
+                '2fa_enabled': False  # Not enabled until verified
+            })
             
             # Generate QR code
-            totp = pyotp.TOTP(secret)
+            totp = get_totp(secret)
             provisioning_uri = totp.provisioning_uri(
                 name=current_username,
                 issuer_name="WOL Gateway"
             )
             
             qr_code = generate_qr_code(provisioning_uri)
-            return render_template_string(SETUP_2FA_TEMPLATE, 
-                                         secret=secret,
-                                         qr_code=qr_code)
+            return render_template('admin/setup_2fa.html', 
+                                   secret=secret,
+                                   qr_code=qr_code)
         
         elif action == 'verify_2fa':
             totp_code = request.form.get('totp_code', '')
-            totp = pyotp.TOTP(current_user['2fa_secret'])
+            totp = get_totp(current_user['2fa_secret'])
             
             if totp.verify(totp_code, valid_window=1):
-                current_user['2fa_enabled'] = True
-                save_admin_config(admin_config)
+                update_admin_user(current_username, {'2fa_enabled': True})
                 flash('2FA enabled successfully', 'success')
                 return redirect(url_for('admin.security_settings'))
             else:
@@ -624,2089 +1100,32 @@ def security_settings():
         
         elif action == 'disable_2fa':
             password = request.form.get('password', '')
-            if verify_password(password, current_user['password_hash']):
-                current_user['2fa_enabled'] = False
-                current_user['2fa_secret'] = ''
-                save_admin_config(admin_config)
+            if authenticate_user(admin_config, current_username, password):
+                update_admin_user(current_username, {'2fa_enabled': False, '2fa_secret': ''})
                 flash('2FA disabled successfully', 'success')
             else:
                 flash('Incorrect password', 'error')
         
         return redirect(url_for('admin.security_settings'))
     
-    return render_template_string(SECURITY_TEMPLATE, 
-                                 two_fa_enabled=current_user.get('2fa_enabled', False))
-
-
-# HTML Templates
-LOGIN_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Admin Login - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #ffffff;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --shadow: rgba(0,0,0,0.2);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.5);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .login-container {
-            background: var(--card-bg);
-            padding: 40px;
-            border-radius: 10px;
-            box-shadow: 0 10px 40px var(--shadow);
-            width: 100%;
-            max-width: 400px;
-            position: relative;
-        }
-        .theme-toggle {
-            position: fixed;
-            top: 15px;
-            left: 15px;
-            background: none;
-            border: none;
-            font-size: 24px;
-            cursor: pointer;
-            opacity: 0.7;
-            transition: opacity 0.2s;
-            z-index: 1000;
-            color: var(--text-color);
-        }
-        .theme-toggle:hover {
-            opacity: 1;
-        }
-        h1 {
-            text-align: center;
-            color: var(--text-color);
-            margin-bottom: 30px;
-            font-size: 24px;
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        label {
-            display: block;
-            margin-bottom: 5px;
-            color: var(--text-color);
-            font-weight: 500;
-        }
-        input[type="text"], input[type="password"] {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 14px;
-            transition: border-color 0.3s;
-            background: var(--input-bg);
-            color: var(--text-color);
-        }
-        input[type="text"]:focus, input[type="password"]:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        button {
-            width: 100%;
-            padding: 12px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            border-radius: 5px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: transform 0.2s;
-        }
-        button:hover {
-            transform: translateY(-2px);
-        }
-        button:active {
-            transform: translateY(0);
-        }
-        .error {
-            background: #fee;
-            color: #c33;
-            padding: 10px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-            border-left: 4px solid #c33;
-        }
-        .lock-icon {
-            text-align: center;
-            font-size: 48px;
-            margin-bottom: 20px;
-        }
-    </style>
-</head>
-<body>
-    <button class="theme-toggle" onclick="toggleTheme()" title="Toggle dark mode"><i class="fas fa-moon"></i></button>
-    <div class="login-container">
-        <div class="lock-icon"><i class="fas fa-lock"></i></div>
-        <h1>WOL Gateway Admin</h1>
-        {% if error %}
-        <div class="error">{{ error }}</div>
-        {% endif %}
-        <form method="POST">
-            <div class="form-group">
-                <label for="username">Username</label>
-                <input type="text" id="username" name="username" required autofocus>
-            </div>
-            <div class="form-group">
-                <label for="password">Password</label>
-                <input type="password" id="password" name="password" required>
-            </div>
-            {% if require_2fa %}
-            <div class="form-group">
-                <label for="totp_code">2FA Code</label>
-                <input type="text" id="totp_code" name="totp_code" required 
-                       placeholder="6-digit code" pattern="[0-9]{6}" maxlength="6">
-            </div>
-            {% endif %}
-            <button type="submit">Login</button>
-        </form>
-    </div>
-    <script>
-        function toggleTheme() {
-            const html = document.documentElement;
-            const currentTheme = html.getAttribute('data-theme');
-            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-            html.setAttribute('data-theme', newTheme);
-            localStorage.setItem('theme', newTheme);
-            updateThemeIcon();
-        }
-        function updateThemeIcon() {
-            const theme = document.documentElement.getAttribute('data-theme');
-            const toggle = document.querySelector('.theme-toggle i');
-            toggle.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
-        }
-        // Load theme on page load
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-        updateThemeIcon();
-    </script>
-</body>
-</html>
-'''
-
-VERIFY_2FA_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>2FA Verification - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #ffffff;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --shadow: rgba(0,0,0,0.2);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.5);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .verify-container {
-            background: var(--card-bg);
-            padding: 40px;
-            border-radius: 10px;
-            box-shadow: 0 10px 40px var(--shadow);
-            width: 100%;
-            max-width: 400px;
-            text-align: center;
-        }
-        .theme-toggle {
-            position: fixed;
-            top: 15px;
-            left: 15px;
-            background: none;
-            border: none;
-            font-size: 24px;
-            cursor: pointer;
-            opacity: 0.7;
-            transition: opacity 0.2s;
-            z-index: 1000;
-            color: var(--text-color);
-        }
-        .theme-toggle:hover {
-            opacity: 1;
-        }
-        .shield-icon {
-            font-size: 64px;
-            margin-bottom: 20px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-        h1 {
-            color: var(--text-color);
-            margin-bottom: 10px;
-            font-size: 24px;
-        }
-        .username-display {
-            color: #667eea;
-            font-weight: 600;
-            margin-bottom: 20px;
-            font-size: 18px;
-        }
-        .instructions {
-            color: var(--text-color);
-            margin-bottom: 30px;
-            opacity: 0.8;
-            font-size: 14px;
-        }
-        .error {
-            background: #fee;
-            color: #c33;
-            padding: 10px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-            border-left: 4px solid #c33;
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        input[type="text"] {
-            width: 100%;
-            padding: 15px;
-            border: 2px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 24px;
-            text-align: center;
-            letter-spacing: 8px;
-            font-weight: 600;
-            background: var(--input-bg);
-            color: var(--text-color);
-            transition: border-color 0.3s;
-        }
-        input[type="text"]:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        button {
-            width: 100%;
-            padding: 12px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            border-radius: 5px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: transform 0.2s;
-        }
-        button:hover {
-            transform: translateY(-2px);
-        }
-        button:active {
-            transform: translateY(0);
-        }
-        .cancel-link {
-            display: block;
-            margin-top: 15px;
-            color: var(--text-color);
-            opacity: 0.6;
-            text-decoration: none;
-            font-size: 14px;
-        }
-        .cancel-link:hover {
-            opacity: 1;
-        }
-    </style>
-</head>
-<body>
-    <button class="theme-toggle" onclick="toggleTheme()" title="Toggle dark mode"><i class="fas fa-moon"></i></button>
-    <div class="verify-container">
-        <div class="shield-icon"><i class="fas fa-shield-alt"></i></div>
-        <h1>Two-Factor Authentication</h1>
-        <div class="username-display">{{ username }}</div>
-        <p class="instructions">Enter the 6-digit code from your authenticator app</p>
-        {% if error %}
-        <div class="error">{{ error }}</div>
-        {% endif %}
-        <form method="POST">
-            <div class="form-group">
-                <input type="text" id="totp_code" name="totp_code" required autofocus
-                       placeholder="000000" pattern="[0-9]{6}" maxlength="6">
-            </div>
-            <button type="submit">Verify</button>
-        </form>
-        <a href="{{ url_for('admin.login') }}" class="cancel-link">Cancel</a>
-    </div>
-    <script>
-        function toggleTheme() {
-            const html = document.documentElement;
-            const currentTheme = html.getAttribute('data-theme');
-            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-            html.setAttribute('data-theme', newTheme);
-            localStorage.setItem('theme', newTheme);
-            updateThemeIcon();
-        }
-        function updateThemeIcon() {
-            const theme = document.documentElement.getAttribute('data-theme');
-            const toggle = document.querySelector('.theme-toggle i');
-            toggle.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
-        }
-        // Load theme on page load
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-        updateThemeIcon();
-        
-        // Auto-submit when 6 digits entered
-        document.getElementById('totp_code').addEventListener('input', function(e) {
-            if (e.target.value.length === 6) {
-                e.target.form.submit();
-            }
-        });
-    </script>
-</body>
-</html>
-'''
-
-INITIAL_2FA_SETUP_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Setup Two-Factor Authentication - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #ffffff;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --shadow: rgba(0,0,0,0.2);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.5);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .setup-container {
-            background: var(--card-bg);
-            padding: 40px;
-            border-radius: 10px;
-            box-shadow: 0 10px 40px var(--shadow);
-            width: 100%;
-            max-width: 500px;
-            text-align: center;
-        }
-        .theme-toggle {
-            position: fixed;
-            top: 15px;
-            left: 15px;
-            background: none;
-            border: none;
-            font-size: 24px;
-            cursor: pointer;
-            opacity: 0.7;
-            transition: opacity 0.2s;
-            z-index: 1000;
-            color: var(--text-color);
-        }
-        .theme-toggle:hover {
-            opacity: 1;
-        }
-        .shield-icon {
-            font-size: 64px;
-            margin-bottom: 20px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-        h1 {
-            color: var(--text-color);
-            margin-bottom: 10px;
-            font-size: 24px;
-        }
-        .username-display {
-            color: #667eea;
-            font-weight: 600;
-            margin-bottom: 20px;
-            font-size: 18px;
-        }
-        .instructions {
-            color: var(--text-color);
-            margin-bottom: 25px;
-            opacity: 0.8;
-            font-size: 14px;
-            line-height: 1.6;
-        }
-        .step-number {
-            display: inline-block;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            width: 24px;
-            height: 24px;
-            border-radius: 50%;
-            line-height: 24px;
-            font-weight: 600;
-            font-size: 12px;
-            margin-right: 8px;
-        }
-        .qr-container {
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            margin: 20px 0;
-            display: inline-block;
-        }
-        .qr-container img {
-            display: block;
-            max-width: 250px;
-            height: auto;
-        }
-        .secret-key {
-            background: var(--input-bg);
-            padding: 15px;
-            border-radius: 5px;
-            border: 2px solid var(--border-color);
-            margin: 20px 0;
-            font-family: monospace;
-            font-size: 14px;
-            word-break: break-all;
-            color: var(--text-color);
-        }
-        .error {
-            background: #fee;
-            color: #c33;
-            padding: 10px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-            border-left: 4px solid #c33;
-        }
-        .form-group {
-            margin: 20px 0;
-        }
-        input[type="text"] {
-            width: 100%;
-            padding: 15px;
-            border: 2px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 20px;
-            text-align: center;
-            letter-spacing: 6px;
-            font-weight: 600;
-            background: var(--input-bg);
-            color: var(--text-color);
-            transition: border-color 0.3s;
-        }
-        input[type="text"]:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        button {
-            width: 100%;
-            padding: 12px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            border-radius: 5px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: transform 0.2s;
-            margin-top: 10px;
-        }
-        button:hover {
-            transform: translateY(-2px);
-        }
-        button:active {
-            transform: translateY(0);
-        }
-        .help-text {
-            font-size: 12px;
-            opacity: 0.6;
-            margin-top: 10px;
-        }
-    </style>
-</head>
-<body>
-    <button class="theme-toggle" onclick="toggleTheme()" title="Toggle dark mode"><i class="fas fa-moon"></i></button>
-    <div class="setup-container">
-        <div class="shield-icon"><i class="fas fa-shield-alt"></i></div>
-        <h1>Complete Your 2FA Setup</h1>
-        <div class="username-display">{{ username }}</div>
-        <p class="instructions">
-            <span class="step-number">1</span> Scan this QR code with your authenticator app<br>
-            (Google Authenticator, Authy, Microsoft Authenticator, etc.)
-        </p>
-        {% if qr_code %}
-        <div class="qr-container">
-            <img src="data:image/png;base64,{{ qr_code }}" alt="2FA QR Code">
-        </div>
-        {% endif %}
-        <p class="instructions">
-            <span class="step-number">2</span> Or manually enter this secret key:
-        </p>
-        <div class="secret-key">{{ secret }}</div>
-        <p class="instructions">
-            <span class="step-number">3</span> Enter the 6-digit code from your app to verify:
-        </p>
-        {% if error %}
-        <div class="error">{{ error }}</div>
-        {% endif %}
-        <form method="POST">
-            <div class="form-group">
-                <input type="text" id="totp_code" name="totp_code" required autofocus
-                       placeholder="000000" pattern="[0-9]{6}" maxlength="6">
-            </div>
-            <button type="submit">Verify & Complete Setup</button>
-        </form>
-        <p class="help-text">Keep your authenticator app - you'll need it for future logins</p>
-    </div>
-    <script>
-        function toggleTheme() {
-            const html = document.documentElement;
-            const currentTheme = html.getAttribute('data-theme');
-            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-            html.setAttribute('data-theme', newTheme);
-            localStorage.setItem('theme', newTheme);
-            updateThemeIcon();
-        }
-        function updateThemeIcon() {
-            const theme = document.documentElement.getAttribute('data-theme');
-            const toggle = document.querySelector('.theme-toggle i');
-            toggle.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
-        }
-        // Load theme on page load
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-        updateThemeIcon();
-        
-        // Auto-submit when 6 digits entered
-        document.getElementById('totp_code').addEventListener('input', function(e) {
-            if (e.target.value.length === 6) {
-                e.target.form.submit();
-            }
-        });
-    </script>
-</body>
-</html>
-'''
-
-DASHBOARD_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Admin Dash - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #f5f5f5;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --hover-bg: #f8f9fa;
-            --shadow: rgba(0,0,0,0.1);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --hover-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.3);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .header {
-            background: var(--card-bg);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-            margin-bottom: 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        h1 { color: var(--text-color); font-size: 24px; }
-        .theme-toggle {
-            position: fixed;
-            top: 20px;
-            left: 20px;
-            background: none;
-            border: none;
-            font-size: 28px;
-            cursor: pointer;
-            z-index: 1000;
-            color: var(--text-color);
-            opacity: 0.7;
-            transition: opacity 0.3s;
-        }
-        .theme-toggle:hover {
-            opacity: 1;
-        }
-        .nav {
-            display: flex;
-            gap: 15px;
-        }
-        .nav a, .nav button {
-            padding: 10px 20px;
-            background: #667eea;
-            color: white;
-            text-decoration: none;
-            border-radius: 5px;
-            border: none;
-            cursor: pointer;
-            font-size: 14px;
-        }
-        .nav a:hover, .nav button:hover {
-            background: #5568d3;
-        }
-        .nav .restart-btn {
-            background: #f39c12;
-        }
-        .nav .restart-btn:hover {
-            background: #e67e22;
-        }
-        .nav .logout {
-            background: #e74c3c;
-        }
-        .nav .logout:hover {
-            background: #c0392b;
-        }
-        .alert {
-            padding: 15px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-        }
-        .alert-success {
-            background: #d4edda;
-            color: #155724;
-            border-left: 4px solid #28a745;
-        }
-        .card {
-            background: var(--card-bg);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-            margin-bottom: 20px;
-        }
-        .card h2 {
-            color: var(--text-color);
-            margin-bottom: 15px;
-            font-size: 20px;
-        }
-        .info-box {
-            background: var(--hover-bg);
-            padding: 15px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-        }
-        .info-box p {
-            margin: 5px 0;
-            color: var(--text-color);
-        }
-        .info-box strong {
-            color: var(--text-color);
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        th {
-            background: var(--hover-bg);
-            padding: 12px;
-            text-align: left;
-            font-weight: 600;
-            color: var(--text-color);
-            border-bottom: 2px solid var(--border-color);
-        }
-        td {
-            padding: 12px;
-            border-bottom: 1px solid var(--border-color);
-            color: var(--text-color);
-        }
-        tr:hover {
-            background: var(--hover-bg);
-        }
-        .actions {
-            display: flex;
-            gap: 10px;
-        }
-        .btn {
-            padding: 6px 12px;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 13px;
-            text-decoration: none;
-            display: inline-block;
-        }
-        .btn-edit {
-            background: #3498db;
-            color: white;
-        }
-        .btn-edit:hover {
-            background: #2980b9;
-        }
-        .btn-delete {
-            background: #e74c3c;
-            color: white;
-        }
-        .btn-delete:hover {
-            background: #c0392b;
-        }
-        .btn-add {
-            background: #27ae60;
-            color: white;
-            padding: 10px 20px;
-            margin-bottom: 15px;
-            display: inline-block;
-        }
-        .btn-add:hover {
-            background: #229954;
-        }
-        .warning {
-            background: #fff3cd;
-            color: #856404;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #ffc107;
-            margin-bottom: 20px;
-        }
-    </style>
-</head>
-<body>
-    <button class="theme-toggle" onclick="toggleTheme()" title="Toggle dark mode"><i class="fas fa-moon"></i></button>
-    <div class="container">
-        <div class="header">
-            <h1><i class="fas fa-cog"></i> Admin Dash</h1>
-            <div class="nav">
-                <a href="{{ url_for('admin.manage_users') }}"><i class="fas fa-users"></i> Users</a>
-                <a href="{{ url_for('admin.security_settings') }}"><i class="fas fa-shield-alt"></i> Security</a>
-                <a href="/" target="_blank"><i class="fas fa-home"></i> Home</a>
-                <form method="POST" action="{{ url_for('admin.restart_application') }}" style="display: inline;">
-                    <button type="submit" class="restart-btn" onclick="return confirm('Are you sure you want to restart the application? This will take a few seconds.');"><i class="fas fa-sync-alt"></i> Restart</button>
-                </form>
-                <a href="{{ url_for('admin.logout') }}" class="logout">Logout</a>
-            </div>
-        </div>
-        
-        {% with messages = get_flashed_messages(with_categories=true) %}
-            {% if messages %}
-                {% for category, message in messages %}
-                <div class="alert alert-{{ category }}">{{ message }}</div>
-                {% endfor %}
-            {% endif %}
-        {% endwith %}
-        
-        <div class="warning">
-            <i class="fas fa-exclamation-triangle"></i> <strong>Important:</strong> Configuration changes require restarting the WOL Gateway app.
-        </div>
-        
-        <div class="card">
-            <h2>Global Settings</h2>
-            <div class="info-box">
-                <p><strong>Flask Port:</strong> {{ port }}</p>
-                <p><em>Note: Port cannot be changed from admin panel. Use setup_wol.py to change the port.</em></p>
-            </div>
-        </div>
-        
-        <div class="card">
-            <h2>Server Configuration</h2>
-            <a href="{{ url_for('admin.add_server') }}" class="btn btn-add"><i class="fas fa-plus"></i> Add New Server</a>
-            
-            {% if servers %}
-            <table>
-                <thead>
-                    <tr>
-                        <th>ID</th>
-                        <th>Name</th>
-                        <th>MAC Address</th>
-                        <th>Broadcast Address</th>
-                        <th>Site URL</th>
-                        <th>Wait Time</th>
-                        <th>Status</th>
-                        <th>Actions</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for server in servers %}
-                    <tr>
-                        <td>{{ loop.index0 }}</td>
-                        <td><strong>{{ server.NAME }}</strong></td>
-                        <td><code>{{ server.WOL_MAC_ADDRESS }}</code></td>
-                        <td>{{ server.BROADCAST_ADDRESS }}</td>
-                        <td>{{ server.SITE_URL }}</td>
-                        <td>{{ server.WAIT_TIME_SECONDS }}s</td>
-                        <td>
-                            {% if server.get('locked', False) %}
-                                <span style="color: #e74c3c;"><i class="fas fa-lock"></i> Locked</span>
-                            {% else %}
-                                <span style="color: #27ae60;"><i class="fas fa-lock-open"></i> Open</span>
-                            {% endif %}
-                        </td>
-                        <td>
-                            <div class="actions">
-                                <a href="{{ url_for('admin.edit_server', server_id=loop.index0) }}" 
-                                   class="btn btn-edit">Edit</a>
-                                <form method="POST" 
-                                      action="{{ url_for('admin.delete_server', server_id=loop.index0) }}"
-                                      style="display: inline;"
-                                      onsubmit="return confirm('Are you sure you want to delete {{ server.NAME }}?');">
-                                    <button type="submit" class="btn btn-delete">Delete</button>
-                                </form>
-                            </div>
-                        </td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-            {% else %}
-            <p style="color: #999; text-align: center; padding: 40px;">No servers configured yet.</p>
-            {% endif %}
-        </div>
-    </div>
-    <script>
-        function toggleTheme() {
-            const html = document.documentElement;
-            const currentTheme = html.getAttribute('data-theme');
-            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-            html.setAttribute('data-theme', newTheme);
-            localStorage.setItem('theme', newTheme);
-            updateThemeIcon();
-        }
-        function updateThemeIcon() {
-            const theme = document.documentElement.getAttribute('data-theme');
-            const toggle = document.querySelector('.theme-toggle i');
-            toggle.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
-        }
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-        updateThemeIcon();
-    </script>
-</body>
-</html>
-'''
-
-SERVER_FORM_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{{ action }} Server - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #f5f5f5;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --shadow: rgba(0,0,0,0.1);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.3);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-        }
-        .header {
-            background: var(--card-bg);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-            margin-bottom: 20px;
-        }
-        h1 { color: var(--text-color); font-size: 24px; }
-        .card {
-            background: var(--card-bg);
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        label {
-            display: block;
-            margin-bottom: 5px;
-            color: var(--text-color);
-            font-weight: 500;
-        }
-        input[type="text"], input[type="number"] {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 14px;
-            background: var(--input-bg);
-            color: var(--text-color);
-        }
-        input[type="text"]:focus, input[type="number"]:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        .help-text {
-            font-size: 12px;
-            color: #999;
-            margin-top: 5px;
-        }
-        .button-group {
-            display: flex;
-            gap: 10px;
-            margin-top: 30px;
-        }
-        button, .btn-link {
-            padding: 12px 24px;
-            border: none;
-            border-radius: 5px;
-            font-size: 14px;
-            cursor: pointer;
-            text-decoration: none;
-            display: inline-block;
-        }
-        button[type="submit"] {
-            background: #27ae60;
-            color: white;
-        }
-        button[type="submit"]:hover {
-            background: #229954;
-        }
-        .btn-link {
-            background: #95a5a6;
-            color: white;
-        }
-        .btn-link:hover {
-            background: #7f8c8d;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>{{ action }} Server</h1>
-        </div>
-        
-        <div class="card">
-            <form method="POST">
-                <div class="form-group">
-                    <label for="name">Server Name *</label>
-                    <input type="text" id="name" name="name" required
-                           value="{{ server.NAME if server else '' }}">
-                    <div class="help-text">A friendly name for this server (e.g., "Main Server", "NAS")</div>
-                </div>
-                
-                <div class="form-group">
-                    <label for="mac">MAC Address *</label>
-                    <input type="text" id="mac" name="mac" required
-                           pattern="([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})"
-                           value="{{ server.WOL_MAC_ADDRESS if server else '' }}"
-                           placeholder="00:11:22:33:44:55">
-                    <div class="help-text">MAC address in format XX:XX:XX:XX:XX:XX or XX-XX-XX-XX-XX-XX</div>
-                </div>
-                
-                <div class="form-group">
-                    <label for="broadcast">Broadcast Address</label>
-                    <input type="text" id="broadcast" name="broadcast"
-                           value="{{ server.BROADCAST_ADDRESS if server else '255.255.255.255' }}">
-                    <div class="help-text">Network broadcast address (default: 255.255.255.255)</div>
-                </div>
-                
-                <div class="form-group">
-                    <label for="url">Site URL *</label>
-                    <input type="text" id="url" name="url" required
-                           value="{{ server.SITE_URL if server else '' }}"
-                           placeholder="http://192.168.1.100:8080">
-                    <div class="help-text">URL to redirect to after waking the server</div>
-                </div>
-                
-                <div class="form-group">
-                    <label for="ip_address">Server IP Address (Optional)</label>
-                    <input type="text" id="ip_address" name="ip_address"
-                           value="{{ server.IP_ADDRESS if server and server.IP_ADDRESS else '' }}"
-                           placeholder="192.168.1.100"
-                           pattern="^((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$">
-                    <div class="help-text">If provided, the gateway will check this IP's port until the server responds (recommended)</div>
-                </div>
-                
-                <div class="form-group">
-                    <label for="check_port">TCP Port to Check (Optional)</label>
-                    <input type="number" id="check_port" name="check_port" min="1" max="65535"
-                           value="{{ server.CHECK_PORT if server and server.CHECK_PORT else '22' }}"
-                           placeholder="22">
-                    <div class="help-text">Port to check when monitoring server startup (default: 22 for SSH, use 80/443 for web servers)</div>
-                </div>
-                
-                <div class="form-group">
-                    <label for="wait_time">Maximum Wait Time (seconds) *</label>
-                    <input type="number" id="wait_time" name="wait_time" required min="1"
-                           value="{{ server.WAIT_TIME_SECONDS if server else '60' }}">
-                    <div class="help-text">Maximum time to wait for server response (or fixed wait time if no IP provided)</div>
-                </div>
-                
-                <div class="form-group">
-                    <label style="display: flex; align-items: center; cursor: pointer;">
-                        <input type="checkbox" id="locked" name="locked" 
-                               {% if server and server.get('locked', False) %}checked{% endif %}
-                               style="margin-right: 10px; width: auto; cursor: pointer;"
-                               onchange="togglePinField()">
-                        <span><i class="fas fa-lock"></i> Lock Server (Require PIN to start)</span>
-                    </label>
-                    <div class="help-text">When locked, users must enter a PIN before starting the server</div>
-                </div>
-                
-                <div class="form-group" id="pin-group" style="display: {% if server and server.get('locked', False) %}block{% else %}none{% endif %};">
-                    <label for="pin">Server PIN</label>
-                    <input type="text" id="pin" name="pin" 
-                           pattern="[0-9]*" inputmode="numeric"
-                           maxlength="10"
-                           value="{{ server.get('pin', '') if server else '' }}"
-                           placeholder="Enter numeric PIN">
-                    <div class="help-text">Numeric PIN (up to 10 digits) required to unlock and start this server</div>
-                </div>
-                
-                <div class="button-group">
-                    <button type="submit"><i class="fas fa-save"></i> Save Server</button>
-                    <a href="{{ url_for('admin.dashboard') }}" class="btn-link">Cancel</a>
-                </div>
-            </form>
-        </div>
-    </div>
-    <script>
-        function togglePinField() {
-            const locked = document.getElementById('locked').checked;
-            const pinGroup = document.getElementById('pin-group');
-            pinGroup.style.display = locked ? 'block' : 'none';
-            if (!locked) {
-                document.getElementById('pin').value = '';
-            }
-        }
-        
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-    </script>
-</body>
-</html>
-'''
-
-SECURITY_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Security Settings - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #f5f5f5;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --hover-bg: #f8f9fa;
-            --shadow: rgba(0,0,0,0.1);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --hover-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.3);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-        }
-        .header {
-            background: var(--card-bg);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-            margin-bottom: 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        h1 { color: var(--text-color); font-size: 24px; }
-        .nav a {
-            padding: 10px 20px;
-            background: #667eea;
-            color: white;
-            text-decoration: none;
-            border-radius: 5px;
-        }
-        .nav a:hover {
-            background: #5568d3;
-        }
-        .alert {
-            padding: 15px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-        }
-        .alert-success {
-            background: #d4edda;
-            color: #155724;
-            border-left: 4px solid #28a745;
-        }
-        .alert-error {
-            background: #f8d7da;
-            color: #721c24;
-            border-left: 4px solid #dc3545;
-        }
-        .card {
-            background: var(--card-bg);
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-            margin-bottom: 20px;
-        }
-        .card h2 {
-            color: var(--text-color);
-            margin-bottom: 20px;
-            font-size: 20px;
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        label {
-            display: block;
-            margin-bottom: 5px;
-            color: var(--text-color);
-            font-weight: 500;
-        }
-        input[type="password"] {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 14px;
-            background: var(--input-bg);
-            color: var(--text-color);
-        }
-        input[type="password"]:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        button {
-            padding: 12px 24px;
-            border: none;
-            border-radius: 5px;
-            font-size: 14px;
-            cursor: pointer;
-            color: white;
-        }
-        .btn-primary {
-            background: #667eea;
-        }
-        .btn-primary:hover {
-            background: #5568d3;
-        }
-        .btn-success {
-            background: #27ae60;
-        }
-        .btn-success:hover {
-            background: #229954;
-        }
-        .btn-danger {
-            background: #e74c3c;
-        }
-        .btn-danger:hover {
-            background: #c0392b;
-        }
-        .status-badge {
-            display: inline-block;
-            padding: 5px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-        }
-        .status-enabled {
-            background: #d4edda;
-            color: #155724;
-        }
-        .status-disabled {
-            background: #f8d7da;
-            color: #721c24;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1><i class="fas fa-shield-alt"></i> Security Settings</h1>
-            <div class="nav">
-                <a href="{{ url_for('admin.dashboard') }}">← Back to Dashboard</a>
-            </div>
-        </div>
-        
-        {% with messages = get_flashed_messages(with_categories=true) %}
-            {% if messages %}
-                {% for category, message in messages %}
-                <div class="alert alert-{{ category }}">{{ message }}</div>
-                {% endfor %}
-            {% endif %}
-        {% endwith %}
-        
-        <div class="card">
-            <h2>Change Password</h2>
-            <form method="POST">
-                <input type="hidden" name="action" value="change_password">
-                <div class="form-group">
-                    <label for="current_password">Current Password</label>
-                    <input type="password" id="current_password" name="current_password" required>
-                </div>
-                <div class="form-group">
-                    <label for="new_password">New Password</label>
-                    <input type="password" id="new_password" name="new_password" required minlength="6">
-                </div>
-                <div class="form-group">
-                    <label for="confirm_password">Confirm New Password</label>
-                    <input type="password" id="confirm_password" name="confirm_password" required minlength="6">
-                </div>
-                <button type="submit" class="btn-primary">Update Password</button>
-            </form>
-        </div>
-        
-        <div class="card">
-            <h2>Two-Factor Authentication (2FA)</h2>
-            <p style="margin-bottom: 15px;">
-                Status: 
-                {% if two_fa_enabled %}
-                <span class="status-badge status-enabled"><i class="fas fa-check"></i> Enabled</span>
-                {% else %}
-                <span class="status-badge status-disabled"><i class="fas fa-times"></i> Disabled</span>
-                {% endif %}
-            </p>
-            
-            {% if two_fa_enabled %}
-            <p style="color: #555; margin-bottom: 20px;">
-                Two-factor authentication is currently enabled. Enter your password to disable it.
-            </p>
-            <form method="POST">
-                <input type="hidden" name="action" value="disable_2fa">
-                <div class="form-group">
-                    <label for="password">Password</label>
-                    <input type="password" id="password" name="password" required>
-                </div>
-                <button type="submit" class="btn-danger">Disable 2FA</button>
-            </form>
-            {% else %}
-            <p style="color: #555; margin-bottom: 20px;">
-                Add an extra layer of security by requiring a 6-digit code from your authenticator app 
-                (Google Authenticator, Authy, etc.) when logging in.
-            </p>
-            <form method="POST">
-                <input type="hidden" name="action" value="enable_2fa">
-                <button type="submit" class="btn-success">Enable 2FA</button>
-            </form>
-            {% endif %}
-        </div>
-    </div>
-    <script>
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-    </script>
-</body>
-</html>
-'''
-
-SETUP_2FA_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Setup 2FA - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #f5f5f5;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --step-bg: #f8f9fa;
-            --shadow: rgba(0,0,0,0.1);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --step-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.3);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .container {
-            max-width: 600px;
-            margin: 0 auto;
-        }
-        .card {
-            background: var(--card-bg);
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-        }
-        h1 {
-            color: var(--text-color);
-            margin-bottom: 20px;
-            font-size: 24px;
-            text-align: center;
-        }
-        .step {
-            margin-bottom: 25px;
-            padding: 15px;
-            background: var(--step-bg);
-            border-radius: 5px;
-        }
-        .step h3 {
-            color: #667eea;
-            margin-bottom: 10px;
-            font-size: 16px;
-        }
-        .step p {
-            color: var(--text-color);
-            line-height: 1.6;
-        }
-        .step ul {
-            color: var(--text-color);
-        }
-        .qr-container {
-            text-align: center;
-            margin: 20px 0;
-        }
-        .qr-container img {
-            max-width: 250px;
-            border: 2px solid var(--border-color);
-            border-radius: 5px;
-            padding: 10px;
-            background: white;
-        }
-        .secret-code {
-            background: #e8f4f8;
-            padding: 15px;
-            border-radius: 5px;
-            text-align: center;
-            margin: 20px 0;
-            border: 1px solid #b8dce8;
-        }
-        .secret-code code {
-            font-size: 18px;
-            font-weight: 600;
-            color: #2c3e50;
-            letter-spacing: 2px;
-        }
-        .form-group {
-            margin: 20px 0;
-        }
-        label {
-            display: block;
-            margin-bottom: 5px;
-            color: var(--text-color);
-            font-weight: 500;
-        }
-        input[type="text"] {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 16px;
-            text-align: center;
-            letter-spacing: 5px;
-            background: var(--input-bg);
-            color: var(--text-color);
-        }
-        input[type="text"]:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        button {
-            width: 100%;
-            padding: 12px;
-            background: #27ae60;
-            color: white;
-            border: none;
-            border-radius: 5px;
-            font-size: 16px;
-            cursor: pointer;
-        }
-        button:hover {
-            background: #229954;
-        }
-        .cancel-link {
-            display: block;
-            text-align: center;
-            margin-top: 15px;
-            color: #999;
-            text-decoration: none;
-        }
-        .cancel-link:hover {
-            color: #667eea;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="card">
-            <h1><i class="fas fa-shield-alt"></i> Setup Two-Factor Authentication</h1>
-            
-            <div class="step">
-                <h3>Step 1: Install an Authenticator App</h3>
-                <p>If you don't have one already, install an authenticator app on your phone:</p>
-                <ul style="margin-top: 10px; margin-left: 20px; color: #555;">
-                    <li>Google Authenticator (iOS/Android)</li>
-                    <li>Microsoft Authenticator (iOS/Android)</li>
-                    <li>Authy (iOS/Android/Desktop)</li>
-                </ul>
-            </div>
-            
-            <div class="step">
-                <h3>Step 2: Scan QR Code</h3>
-                <p>Open your authenticator app and scan this QR code:</p>
-                <div class="qr-container">
-                    <img src="data:image/png;base64,{{ qr_code }}" alt="2FA QR Code">
-                </div>
-                <p style="text-align: center; color: #999; font-size: 14px;">Or enter this code manually:</p>
-                <div class="secret-code">
-                    <code>{{ secret }}</code>
-                </div>
-            </div>
-            
-            <div class="step">
-                <h3>Step 3: Verify Setup</h3>
-                <p>Enter the 6-digit code from your authenticator app to complete setup:</p>
-            </div>
-            
-            <form method="POST" action="{{ url_for('admin.security_settings') }}">
-                <input type="hidden" name="action" value="verify_2fa">
-                <div class="form-group">
-                    <label for="totp_code">6-Digit Code</label>
-                    <input type="text" id="totp_code" name="totp_code" required 
-                           pattern="[0-9]{6}" maxlength="6" placeholder="000000" autofocus>
-                </div>
-                <button type="submit"><i class="fas fa-check"></i> Verify and Enable 2FA</button>
-            </form>
-            
-            <a href="{{ url_for('admin.security_settings') }}" class="cancel-link">Cancel</a>
-        </div>
-    </div>
-    <script>
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-    </script>
-</body>
-</html>
-'''
+    return render_template('admin/security.html', 
+                           two_fa_enabled=current_user.get('2fa_enabled', False),
+                           flashes=get_flashed_messages(with_categories=True))
 
 
+@lru_cache(maxsize=16)
 def generate_qr_code(provisioning_uri):
-    """Generate QR code as base64 image."""
+    """Generate QR code as inline SVG markup (cached per provisioning URI)."""
     if not TOTP_AVAILABLE:
         return ""
     
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    # Low error correction keeps the symbol small; fit=True is still needed
+    # because an otpauth:// URI never fits in a version 1 symbol
+    qr = qrcode.QRCode(version=1, box_size=10, border=5,
+                       error_correction=qrcode.constants.ERROR_CORRECT_L)
     qr.add_data(provisioning_uri)
     qr.make(fit=True)
     
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    buffer = BytesIO()
-    img.save(buffer, format='PNG')
-    buffer.seek(0)
+    img = qr.make_image(image_factory=SvgPathImage)
     
-    return base64.b64encode(buffer.getvalue()).decode()
-
-
-# User Management Templates
-USER_MANAGEMENT_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Manage Users - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #f5f5f5;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --hover-bg: #f8f9fa;
-            --shadow: rgba(0,0,0,0.1);
-            --header-bg: #ffffff;
-            --badge-success-bg: #d4edda;
-            --badge-success-color: #155724;
-            --badge-secondary-bg: #e2e3e5;
-            --badge-secondary-color: #383d41;
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --hover-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.3);
-            --header-bg: #2d2d2d;
-            --badge-success-bg: #1e4620;
-            --badge-success-color: #85e089;
-            --badge-secondary-bg: #3d3d3d;
-            --badge-secondary-color: #b0b0b0;
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            min-height: 100vh;
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .theme-toggle {
-            position: fixed;
-            top: 15px;
-            left: 15px;
-            background: none;
-            border: none;
-            font-size: 24px;
-            cursor: pointer;
-            opacity: 0.7;
-            transition: opacity 0.2s;
-            z-index: 1000;
-            color: var(--text-color);
-        }
-        .theme-toggle:hover {
-            opacity: 1;
-        }
-        .header {
-            background: var(--header-bg);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-            margin-bottom: 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            transition: background-color 0.3s;
-        }
-        h1 { 
-            color: var(--text-color); 
-            font-size: 24px; 
-        }
-        .nav {
-            display: flex;
-            gap: 15px;
-        }
-        .nav a, .nav button {
-            padding: 10px 20px;
-            background: #667eea;
-            color: white;
-            text-decoration: none;
-            border-radius: 5px;
-            border: none;
-            cursor: pointer;
-            font-size: 14px;
-        }
-        .nav a:hover, .nav button:hover {
-            background: #5568d3;
-        }
-        .card {
-            background: var(--card-bg);
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-            transition: background-color 0.3s;
-        }
-        h2 {
-            color: var(--text-color);
-            margin-bottom: 20px;
-            font-size: 20px;
-        }
-        .alert {
-            padding: 15px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-        }
-        .alert-success {
-            background: #d4edda;
-            color: #155724;
-            border-left: 4px solid #28a745;
-        }
-        .alert-error {
-            background: #f8d7da;
-            color: #721c24;
-            border-left: 4px solid #dc3545;
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }
-        th {
-            text-align: left;
-            padding: 12px;
-            background: var(--hover-bg);
-            font-weight: 600;
-            color: var(--text-color);
-            border-bottom: 2px solid var(--border-color);
-        }
-        td {
-            padding: 12px;
-            border-bottom: 1px solid var(--border-color);
-            color: var(--text-color);
-        }
-        tr:hover {
-            background: var(--hover-bg);
-        }
-        .badge {
-            display: inline-block;
-            padding: 4px 8px;
-            border-radius: 3px;
-            font-size: 12px;
-            font-weight: 600;
-        }
-        .badge-success {
-            background: var(--badge-success-bg);
-            color: var(--badge-success-color);
-        }
-        .badge-secondary {
-            background: var(--badge-secondary-bg);
-            color: var(--badge-secondary-color);
-        }
-        .actions {
-            display: flex;
-            gap: 10px;
-        }
-        .btn {
-            padding: 6px 12px;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 13px;
-            text-decoration: none;
-            display: inline-block;
-        }
-        .btn-edit {
-            background: #3498db;
-            color: white;
-        }
-        .btn-edit:hover {
-            background: #2980b9;
-        }
-        .btn-delete {
-            background: #e74c3c;
-            color: white;
-        }
-        .btn-delete:hover {
-            background: #c0392b;
-        }
-        .btn-add {
-            background: #27ae60;
-            color: white;
-            padding: 10px 20px;
-            margin-bottom: 15px;
-            display: inline-block;
-        }
-        .btn-add:hover {
-            background: #229954;
-        }
-    </style>
-</head>
-<body>
-    <button class="theme-toggle" onclick="toggleTheme()" title="Toggle dark mode"><i class="fas fa-moon"></i></button>
-    <div class="container">
-        <div class="header">
-            <h1><i class="fas fa-users"></i> User Management</h1>
-            <div class="nav">
-                <a href="{{ url_for('admin.dashboard') }}">← Back to Dashboard</a>
-            </div>
-        </div>
-        
-        {% with messages = get_flashed_messages(with_categories=true) %}
-            {% if messages %}
-                {% for category, message in messages %}
-                <div class="alert alert-{{ category }}">{{ message }}</div>
-                {% endfor %}
-            {% endif %}
-        {% endwith %}
-        
-        <div class="card">
-            <h2>Admin Users</h2>
-            <a href="{{ url_for('admin.add_user') }}" class="btn btn-add"><i class="fas fa-plus"></i> Add New User</a>
-            
-            {% if users %}
-            <table>
-                <thead>
-                    <tr>
-                        <th>Username</th>
-                        <th>2FA Status</th>
-                        <th>Actions</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for user in users %}
-                    <tr>
-                        <td>
-                            <strong>{{ user.username }}</strong>
-                            {% if user.username == current_user %}
-                            <span class="badge badge-success">You</span>
-                            {% endif %}
-                        </td>
-                        <td>
-                            {% if user['2fa_enabled'] %}
-                            <span class="badge badge-success"><i class="fas fa-check"></i> Enabled</span>
-                            {% else %}
-                            <span class="badge badge-secondary">Disabled</span>
-                            {% endif %}
-                        </td>
-                        <td>
-                            <div class="actions">
-                                <a href="{{ url_for('admin.edit_user', username=user.username) }}" 
-                                   class="btn btn-edit">Edit</a>
-                                {% if user.username != current_user %}
-                                <form method="POST" 
-                                      action="{{ url_for('admin.delete_user', username=user.username) }}"
-                                      style="display: inline;"
-                                      onsubmit="return confirm('Are you sure you want to delete {{ user.username }}?');">
-                                    <button type="submit" class="btn btn-delete">Delete</button>
-                                </form>
-                                {% endif %}
-                            </div>
-                        </td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-            {% else %}
-            <p style="color: #999; text-align: center; padding: 40px;">No users configured yet.</p>
-            {% endif %}
-        </div>
-    </div>
-    <script>
-        function toggleTheme() {
-            const html = document.documentElement;
-            const currentTheme = html.getAttribute('data-theme');
-            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-            html.setAttribute('data-theme', newTheme);
-            localStorage.setItem('theme', newTheme);
-            updateThemeIcon();
-        }
-        function updateThemeIcon() {
-            const theme = document.documentElement.getAttribute('data-theme');
-            const toggle = document.querySelector('.theme-toggle i');
-            toggle.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
-        }
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-        updateThemeIcon();
-    </script>
-</body>
-</html>
-'''
-
-USER_FORM_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{{ action }} User - WOL Gateway</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
-    <style>
-        :root {
-            --bg-color: #f5f5f5;
-            --text-color: #333333;
-            --card-bg: #ffffff;
-            --border-color: #e0e0e0;
-            --input-bg: #ffffff;
-            --shadow: rgba(0,0,0,0.1);
-        }
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --text-color: #e0e0e0;
-            --card-bg: #2d2d2d;
-            --border-color: #404040;
-            --input-bg: #3d3d3d;
-            --shadow: rgba(0,0,0,0.3);
-        }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            background: var(--bg-color);
-            color: var(--text-color);
-            min-height: 100vh;
-            padding: 20px;
-            transition: background-color 0.3s, color 0.3s;
-        }
-        .container {
-            max-width: 600px;
-            margin: 0 auto;
-        }
-        .card {
-            background: var(--card-bg);
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px var(--shadow);
-        }
-        h1 {
-            color: var(--text-color);
-            margin-bottom: 20px;
-            font-size: 24px;
-        }
-        .alert {
-            padding: 15px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-        }
-        .alert-error {
-            background: #f8d7da;
-            color: #721c24;
-            border-left: 4px solid #dc3545;
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        label {
-            display: block;
-            margin-bottom: 8px;
-            color: var(--text-color);
-            font-weight: 500;
-        }
-        input[type="text"],
-        input[type="password"] {
-            width: 100%;
-            padding: 12px;
-            border: 1px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 14px;
-            background: var(--input-bg);
-            color: var(--text-color);
-        }
-        input[type="checkbox"] {
-            width: 20px;
-            height: 20px;
-            margin-right: 10px;
-        }
-        .checkbox-group {
-            display: flex;
-            align-items: center;
-        }
-        button {
-            width: 100%;
-            padding: 12px;
-            background: #667eea;
-            color: white;
-            border: none;
-            border-radius: 5px;
-            font-size: 16px;
-            cursor: pointer;
-            margin-top: 10px;
-        }
-        button:hover {
-            background: #5568d3;
-        }
-        .cancel-link {
-            display: block;
-            text-align: center;
-            margin-top: 15px;
-            color: #667eea;
-            text-decoration: none;
-        }
-        .note {
-            color: var(--text-color);
-            opacity: 0.7;
-            font-size: 13px;
-            margin-top: 5px;
-        }
-        .theme-toggle {
-            position: fixed;
-            top: 15px;
-            left: 15px;
-            background: none;
-            border: none;
-            font-size: 24px;
-            cursor: pointer;
-            opacity: 0.7;
-            transition: opacity 0.2s;
-            z-index: 1000;
-            color: var(--text-color);
-        }
-        .theme-toggle:hover {
-            opacity: 1;
-        }
-    </style>
-</head>
-<body>
-    <button class="theme-toggle" onclick="toggleTheme()" title="Toggle dark mode"><i class="fas fa-moon"></i></button>
-    <div class="container">
-        <div class="card">
-            <h1>{{ action }} Admin User</h1>
-            
-            {% with messages = get_flashed_messages(with_categories=true) %}
-                {% if messages %}
-                    {% for category, message in messages %}
-                    <div class="alert alert-{{ category }}">{{ message }}</div>
-                    {% endfor %}
-                {% endif %}
-            {% endwith %}
-            
-            <form method="POST">
-                {% if action == 'Add' %}
-                <div class="form-group">
-                    <label for="username">Username</label>
-                    <input type="text" id="username" name="username" required autofocus>
-                </div>
-                {% else %}
-                <div class="form-group">
-                    <label>Username</label>
-                    <input type="text" value="{{ user.username }}" disabled>
-                    <p class="note">Username cannot be changed</p>
-                </div>
-                {% endif %}
-                
-                <div class="form-group">
-                    <label for="password">Password{% if action == 'Edit' %} (leave blank to keep current){% endif %}</label>
-                    <input type="password" id="password" name="password" {% if action == 'Add' %}required{% endif %} minlength="6">
-                    <p class="note">Minimum 6 characters</p>
-                </div>
-                
-                <div class="form-group">
-                    <label for="confirm_password">Confirm Password</label>
-                    <input type="password" id="confirm_password" name="confirm_password" {% if action == 'Add' %}required{% endif %}>
-                </div>
-                
-                <div class="form-group">
-                    <div class="checkbox-group">
-                        <input type="checkbox" id="enable_2fa" name="enable_2fa" 
-                               {% if user and user['2fa_enabled'] %}checked{% endif %}>
-                        <label for="enable_2fa" style="margin: 0;">Enable Two-Factor Authentication (2FA)</label>
-                    </div>
-                </div>
-                
-                <button type="submit">{{ action }} User</button>
-            </form>
-            
-            <a href="{{ url_for('admin.manage_users') }}" class="cancel-link">Cancel</a>
-        </div>
-    </div>
-    <script>
-        function toggleTheme() {
-            const html = document.documentElement;
-            const currentTheme = html.getAttribute('data-theme');
-            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-            html.setAttribute('data-theme', newTheme);
-            localStorage.setItem('theme', newTheme);
-            updateThemeIcon();
-        }
-        function updateThemeIcon() {
-            const theme = document.documentElement.getAttribute('data-theme');
-            const toggle = document.querySelector('.theme-toggle i');
-            toggle.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
-        }
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-        updateThemeIcon();
-    </script>
-</body>
-</html>
-'''
+    return Markup(img.to_string(encoding='unicode'))
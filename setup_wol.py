@@ -16,13 +16,16 @@ Additionally, this script automatically detects your Linux distribution and
 installs required dependencies (Flask and wakeonlan) if they're missing.
 """
 
+import importlib.util
 import json
 import os
 import re
+import shutil
 import subprocess
 import sys
 import platform
 import socket
+from functools import lru_cache
 
 try:
     from version import __version__, __github_repo__
@@ -96,9 +99,55 @@ def check_for_updates():
     
     return False
 
+# os-release ID -> (distro name, package manager); None means pick dnf or yum at runtime
+DISTRO_PACKAGE_MANAGERS = {
+    'ubuntu': ('Debian/Ubuntu', 'apt'),
+    'debian': ('Debian/Ubuntu', 'apt'),
+    'linuxmint': ('Debian/Ubuntu', 'apt'),
+    'raspbian': ('Debian/Ubuntu', 'apt'),
+    'fedora': ('Fedora', 'dnf'),
+    'rhel': ('RHEL/CentOS', None),
+    'centos': ('RHEL/CentOS', None),
+    'rocky': ('RHEL/CentOS', None),
+    'almalinux': ('RHEL/CentOS', None),
+    'arch': ('Arch Linux', 'pacman'),
+    'manjaro': ('Arch Linux', 'pacman'),
+    'opensuse': ('openSUSE', 'zypper'),
+    'opensuse-leap': ('openSUSE', 'zypper'),
+    'opensuse-tumbleweed': ('openSUSE', 'zypper'),
+    'suse': ('openSUSE', 'zypper'),
+    'alpine': ('Alpine', 'apk'),
+    'termux': ('Termux', 'pkg'),
+}
+
+def read_os_release(paths=('/etc/os-release', '/usr/lib/os-release')):
+    """
+    Parse the os-release file into a dict of lowercased, unquoted values.
+    
+    /etc/os-release is tried first; /usr/lib/os-release is the standard
+    fallback location when it is missing.
+    
+    Returns:
+        dict: KEY -> value, or an empty dict if no os-release file exists
+    """
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                info = {}
+                for line in f:
+                    key, sep, value = line.strip().partition('=')
+                    if sep:
+                        info[key] = value.strip('"\'').lower()
+                return info
+        except FileNotFoundError:
+            continue
+    return {}
+
+@lru_cache(maxsize=None)
 def detect_linux_distro():
     """
     Detects the Linux distribution and returns the package manager to use.
+    The result is cached, since it cannot change while the script runs.
     
     Returns:
         tuple: (distro_name, package_manager) or (None, None) if unknown
@@ -108,32 +157,16 @@ def detect_linux_distro():
     if platform.system() != 'Linux':
         return (platform.system(), None)
     
-    # Try to read /etc/os-release (most modern Linux distros)
-    try:
-        with open('/etc/os-release', 'r') as f:
-            os_release = f.read().lower()
-            
-        # Detect distribution
-        if 'ubuntu' in os_release or 'debian' in os_release or 'mint' in os_release:
-            return ('Debian/Ubuntu', 'aabout:blank#blockedpt')
-        elif 'fedora' in os_release:
-            return ('Fedora', 'dnf')
-        elif 'rhel' in os_release or 'red hat' in os_release or 'centos' in os_release:
-            # Check if dnf or yum is available
-            if subprocess.run(['which', 'dnf'], capture_output=True).returncode == 0:
-                return ('RHEL/CentOS', 'dnf')
-            else:
-                return ('RHEL/CentOS', 'yum')
-        elif 'arch' in os_release or 'manjaro' in os_release:
-            return ('Arch Linux', 'pacman')
-        elif 'opensuse' in os_release or 'suse' in os_release:
-            return ('openSUSE', 'zypper')
-        elif 'alpine' in os_release:
-            return ('Alpine', 'apk')
-        elif 'termux' in os_release:
-            return ('Termux', 'pkg')
-    except FileNotFoundError:
-        pass
+    # Match ID first, then each ID_LIKE entry (e.g. "rhel fedora" for CentOS)
+    os_release = read_os_release()
+    candidates = [os_release.get('ID', '')] + os_release.get('ID_LIKE', '').split()
+    for distro_id in candidates:
+        if distro_id in DISTRO_PACKAGE_MANAGERS:
+            distro, pkg_manager = DISTRO_PACKAGE_MANAGERS[distro_id]
+            if pkg_manager is None:
+                # Check if dnf or yum is available
+                pkg_manager = 'dnf' if shutil.which('dnf') else 'yum'
+            return (distro, pkg_manager)
     
     # Fallback: Check which package manager is available
     package_managers = [
@@ -147,7 +180,7 @@ def detect_linux_distro():
     ]
     
     for cmd, pm in package_managers:
-        if subprocess.run(['which', cmd], capture_output=True).returncode == 0:
+        if shutil.which(cmd):
             return ('Unknown Linux', pm)
     
     return ('Unknown', None)
@@ -162,8 +195,7 @@ def check_command_exists(command):
     Returns:
         bool: True if command exists, False otherwise
     """
-    result = subprocess.run(['which', command], capture_output=True, text=True)
-    return result.returncode == 0
+    return shutil.which(command) is not None
 
 def check_python_package(package_name):
     """
@@ -175,12 +207,43 @@ def check_python_package(package_name):
     Returns:
         bool: True if package is installed, False otherwise
     """
+    # find_spec only locates the package; importing Flask just to check
+    # for it would run all of its import-time setup
     try:
-        __import__(package_name)
-        return True
-    except ImportError:
+        return importlib.util.find_spec(package_name) is not None
+    except (ImportError, ValueError):
         return False
 
+def ensure_sudo_credentials():
+    """
+    Makes sure sudo can run without prompting, asking for the password once if needed.
+    
+    Returns:
+        bool: True if sudo credentials are available, False otherwise
+    """
+    try:
+        # -n fails instead of prompting when credentials aren't cached
+        result = subprocess.run(
+            ['sudo', '-n', 'true'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        if result.returncode == 0:
+            return True
+        print("  Administrator privileges are needed to install wakeonlan")
+        return subprocess.run(['sudo', '-v']).returncode == 0
+    except FileNotFoundError:
+        return False
+
+# Python packages checked by install_dependencies: (import name, pip name, purpose)
+PYTHON_PACKAGES = [
+    ('flask', 'Flask', 'web server'),
+    ('pyotp', 'pyotp', 'admin panel 2FA'),
+    ('qrcode', 'qrcode', 'admin panel 2FA QR codes'),
+    ('argon2', 'argon2-cffi', 'admin panel password hashing'),
+]
+
 def install_dependencies():
     """
     Automatically detects the system and installs required dependencies.
@@ -189,7 +252,7 @@ def install_dependencies():
       - Flask (Python package)
       - pyotp (Python package for 2FA - optional)
       - qrcode (Python package for QR codes - optional)
-      - Pillow (Python package for QR code images - optional)
+      - argon2-cffi (Python package for admin password hashing)
       - wakeonlan (system command-line utility)
     
     Returns:
@@ -220,111 +283,44 @@ def install_dependencies():
     # Track if we need sudo
     needs_sudo = os.geteuid() != 0  # True if not running as root
     
-    # Check Flask
-    print("\n[1/5] Checking Flask...")
-    if check_python_package('flask'):
-        print("  ✓ Flask is already installed")
-    else:
-        print("  ✗ Flask is not installed")
-        print("  Installing Flask via pip3...")
-        
-        try:
-            # Try user installation first (no sudo needed)
-            result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'install', '--user', 'flask'],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                print("  ✓ Flask installed successfully")
-            else:
-                print(f"  ✗ Failed to install Flask: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            print(f"  ✗ Error installing Flask: {e}")
-            return False
-    
-    # Check pyotp (for admin panel 2FA)
-    print("\n[2/5] Checking pyotp...")
-    if check_python_package('pyotp'):
-        print("  ✓ pyotp is already installed")
-    else:
-        print("  ✗ pyotp is not installed")
-        print("  Installing pyotp via pip3...")
-        
-        try:
-            result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'install', '--user', 'pyotp'],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                print("  ✓ pyotp installed successfully")
-            else:
-                print(f"  ✗ Failed to install pyotp: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            print(f"  ✗ Error installing pyotp: {e}")
-            return False
-    
-    # Check qrcode (for admin panel 2FA)
-    print("\n[3/5] Checking qrcode...")
-    if check_python_package('qrcode'):
-        print("  ✓ qrcode is already installed")
-    else:
-        print("  ✗ qrcode is not installed")
-        print("  Installing qrcode via pip3...")
-        
-        try:
-            result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'install', '--user', 'qrcode[pil]'],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                print("  ✓ qrcode installed successfully")
-            else:
-                print(f"  ✗ Failed to install qrcode: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            print(f"  ✗ Error installing qrcode: {e}")
-            return False
+    # Check Python packages, then install whatever is missing in one pip run
+    missing_pip = []
+    for step, (module, package, purpose) in enumerate(PYTHON_PACKAGES, 1):
+        print(f"\n[{step}/5] Checking {package}...")
+        if check_python_package(module):
+            print(f"  ✓ {package} is already installed")
+        else:
+            print(f"  ✗ {package} is not installed ({purpose})")
+            missing_pip.append(package)
     
-    # Check Pillow (for QR code image generation)
-    print("\n[4/5] Checking Pillow...")
-    if check_python_package('PIL') or check_python_package('Pillow'):
-        print("  ✓ Pillow is already installed")
-    else:
-        print("  ✗ Pillow is not installed")
-        print("  Installing Pillow via pip3...")
-        
+    if missing_pip:
+        print(f"\n  Installing {', '.join(missing_pip)} via pip3...")
         try:
+            # Try user installation first (no sudo needed)
             result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'install', '--user', 'Pillow'],
+                [sys.executable, '-m', 'pip', 'install', '--user', *missing_pip],
                 capture_output=True,
                 text=True
             )
             
             if result.returncode == 0:
-                print("  ✓ Pillow installed successfully")
+                print(f"  ✓ {', '.join(missing_pip)} installed successfully")
             else:
-                print(f"  ✗ Failed to install Pillow: {result.stderr}")
+                print(f"  ✗ Failed to install {', '.join(missing_pip)}: {result.stderr}")
                 return False
-                
         except Exception as e:
-            print(f"  ✗ Error installing Pillow: {e}")
+            print(f"  ✗ Error installing {', '.join(missing_pip)}: {e}")
             return False
     
     # Check wakeonlan
     print("\n[5/5] Checking wakeonlan...")
     if check_command_exists('wakeonlan'):
         print("  ✓ wakeonlan is already installed")
+    elif check_python_package('wakeonlan'):
+        # Installed with pip but its script isn't on PATH; the gateway also
+        # looks in ~/.local/bin, so there is nothing to install
+        print("  ✓ wakeonlan Python package is already installed")
+        print("  ⚠ Note: You may need to add ~/.local/bin to your PATH")
     else:
         print("  ✗ wakeonlan is not installed")
         
@@ -356,11 +352,18 @@ def install_dependencies():
             print("  Please install wakeonlan manually")
             return False
         
+        # Add sudo if needed (except for Termux pkg), asking for the password
+        # once here instead of during an install whose output is hidden
+        use_sudo = needs_sudo and pkg_manager != 'pkg'
+        attempts = install_commands[pkg_manager]
+        if use_sudo and not ensure_sudo_credentials():
+            print("  ✗ Could not get administrator privileges")
+            attempts = []
+        
         # Try each package option for this package manager
         installed = False
-        for pkg_name, cmd in install_commands[pkg_manager]:
-            # Add sudo if needed (except for Termux pkg)
-            if needs_sudo and pkg_manager != 'pkg':
+        for pkg_name, cmd in attempts:
+            if use_sudo:
                 full_cmd = ['sudo'] + cmd
             else:
                 full_cmd = cmd
@@ -368,7 +371,11 @@ def install_dependencies():
             print(f"  Trying to install '{pkg_name}': {' '.join(full_cmd)}")
             
             try:
-                result = subprocess.run(full_cmd, capture_output=True, text=True)
+                result = subprocess.run(
+                    full_cmd,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
                 
                 if result.returncode == 0 and check_command_exists('wakeonlan'):
                     print(f"  ✓ wakeonlan installed successfully (as '{pkg_name}' package)")
@@ -386,8 +393,8 @@ def install_dependencies():
             try:
                 result = subprocess.run(
                     [sys.executable, '-m', 'pip', 'install', '--user', 'wakeonlan'],
-                    capture_output=True,
-                    text=True
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
                 )
                 
                 if result.returncode == 0:
@@ -418,6 +425,9 @@ def install_dependencies():
     print("="*50 + "\n")
     return True
 
+# 6 pairs of hex digits separated by : or -
+MAC_ADDRESS_RE = re.compile(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$")
+
 def validate_mac(mac):
     """
     Validates a MAC address format.
@@ -432,10 +442,66 @@ def validate_mac(mac):
     Returns:
         bool: True if the MAC address format is valid, False otherwise
     """
-    # Regex pattern: 6 pairs of hex digits separated by : or -
-    if re.match(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$", mac):
+    return MAC_ADDRESS_RE.match(mac) is not None
+
+def write_json_file(path, data):
+    """
+    Writes data as pretty-printed JSON, only if it changed.
+    
+    An existing file is rewritten in place: the Docker setup bind-mounts the
+    config files individually, and a bind mount keeps pointing at the old
+    inode if the file is replaced. New files are written to a temporary file
+    and moved into place with os.replace, so they never appear half-written.
+    
+    Args:
+        path (str): The file to write
+        data (dict): The data to serialize
+    
+    Returns:
+        bool: True if the file was written, False if it was already up to date
+    """
+    new_bytes = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == new_bytes:
+                return False
+    except FileNotFoundError:
+        pass
+    else:
+        _write_in_place(path, new_bytes)
         return True
-    return False
+    
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(new_bytes)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        # Don't leave the temp file behind (e.g. disk full or Ctrl-C)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Same fallback as admin_panel.write_config_atomic (e.g. EBUSY on a
+        # bind-mounted path inside the container)
+        os.remove(tmp_path)
+        _write_in_place(path, new_bytes)
+    return True
+
+def _write_in_place(path, data):
+    """Overwrites a file's contents without replacing the file itself."""
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+# Last parsed CONFIG_FILE, keyed on its modification time
+_config_cache = {"mtime": None, "data": None}
 
 def load_current_config():
     """
@@ -448,14 +514,24 @@ def load_current_config():
     Returns:
         dict: Configuration dictionary if file exists and is valid, empty dict otherwise
     """
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            # Silently fail if file is corrupted or invalid JSON
-            pass
-    return {}
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return {}
+    
+    # Reuse the last parse while the file hasn't been rewritten
+    if _config_cache["mtime"] == mtime:
+        return _config_cache["data"]
+    
+    try:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except:
+        # Silently fail if file is corrupted or invalid JSON
+        return {}
+    _config_cache["mtime"] = mtime
+    _config_cache["data"] = config
+    return config
 
 
 def setup_admin_panel():
@@ -485,7 +561,7 @@ def setup_admin_panel():
     admin_config = {}
     if os.path.exists(ADMIN_CONFIG_FILE):
         try:
-            with open(ADMIN_CONFIG_FILE, 'r') as f:
+            with open(ADMIN_CONFIG_FILE, 'r', encoding='utf-8') as f:
                 admin_config = json.load(f)
         except:
             pass
@@ -497,8 +573,7 @@ def setup_admin_panel():
         admin_config['admin_enabled'] = False
         if 'users' not in admin_config:
             admin_config['users'] = []
-        with open(ADMIN_CONFIG_FILE, 'w') as f:
-            json.dump(admin_config, f, indent=4)
+        write_json_file(ADMIN_CONFIG_FILE, admin_config)
         print("Admin panel disabled. You can use setup_wol.py to make changes.")
         return True
     
@@ -526,8 +601,15 @@ def setup_admin_panel():
             print("Error: Passwords do not match.")
             continue
         
-        # Hash the password
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        # Hash the password exactly as the admin panel does. If it can't be
+        # imported yet (e.g. Flask was only just installed into a new user
+        # site directory), store a SHA-256 hash; the admin panel upgrades it
+        # on first login
+        try:
+            from admin_panel import hash_password
+            password_hash = hash_password(password)
+        except ImportError:
+            password_hash = hashlib.sha256(password.encode()).hexdigest()
         break
     
     # Ask about 2FA
@@ -578,8 +660,7 @@ def setup_admin_panel():
     
     # Save admin configuration
     try:
-        with open(ADMIN_CONFIG_FILE, 'w') as f:
-            json.dump(admin_config, f, indent=4)
+        write_json_file(ADMIN_CONFIG_FILE, admin_config)
         
         print("\n✓ Admin panel configured successfully!")
         print(f"\nUsername: {username}")
@@ -595,6 +676,9 @@ def load_current_config_old():
     """DEPRECATED - kept for compatibility"""
     return load_current_config()
 
+# Seconds to wait for the Docker daemon to answer before treating it as down
+DOCKER_CHECK_TIMEOUT = 10
+
 def check_docker_installed():
     """
     Check if Docker is installed (command exists).
@@ -602,11 +686,7 @@ def check_docker_installed():
     Returns:
         bool: True if Docker is installed, False otherwise
     """
-    try:
-        result = subprocess.run(['docker', '--version'], capture_output=True, text=True)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    return shutil.which('docker') is not None
 
 def check_docker_running():
     """
@@ -615,10 +695,18 @@ def check_docker_running():
     Returns:
         bool: True if Docker daemon is running, False otherwise
     """
+    # 'docker version' asking for the server version is the cheapest call that
+    # needs the daemon; the timeout keeps a wedged daemon from hanging setup
     try:
-        result = subprocess.run(['docker', 'ps'], capture_output=True, text=True)
+        result = subprocess.run(
+            ['docker', 'version', '--format', '{{.Server.Version}}'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=DOCKER_CHECK_TIMEOUT
+        )
         return result.returncode == 0
-    except FileNotFoundError:
+    except (FileNotFoundError, subprocess.TimeoutExpired):
         return False
 
 def check_docker_available():
@@ -794,7 +882,7 @@ def start_docker():
                     
                     # Enable Docker Desktop to start on login
                     enable_cmd = ['systemctl', '--user', 'enable', 'docker-desktop']
-                    enable_result = subprocess.run(enable_cmd, capture_output=True, text=True)
+                    enable_result = subprocess.run(enable_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                     if enable_result.returncode == 0:
                         print("✓ Docker Desktop configured to start on login")
                     return True
@@ -863,7 +951,7 @@ def start_docker():
                     enable_cmd = ['systemctl', 'enable', 'docker']
                     if needs_sudo:
                         enable_cmd = ['sudo'] + enable_cmd
-                    subprocess.run(enable_cmd, capture_output=True)
+                    subprocess.run(enable_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                     print("✓ Docker configured to start on boot")
                     return True
                 else:
@@ -943,14 +1031,12 @@ def get_local_ip():
         str: Local IP address or 'localhost' if unable to determine
     """
     try:
-        # Create a socket and connect to an external address (doesn't actually send data)
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(0.1)
-        # Use Google's DNS server to determine which interface would be used
-        s.connect(('8.8.8.8', 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-        return local_ip
+        # Connecting a UDP socket only asks the kernel for a route; no packet
+        # is sent, so this is a local lookup of the default interface address
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            # Use Google's DNS server to determine which interface would be used
+            s.connect(('8.8.8.8', 80))
+            return s.getsockname()[0]
     except Exception:
         # Fallback: try to get hostname IP
         try:
@@ -1006,12 +1092,7 @@ def setup_with_docker():
                 print("\nYour WOL Gateway is now running in Docker!")
                 
                 # Get the port from config
-                try:
-                    with open(CONFIG_FILE, 'r') as f:
-                        config = json.load(f)
-                        port = config.get('PORT', 500)
-                except:
-                    port = 500
+                port = load_current_config().get('PORT', 500)
                 
                 # Get local IP address
                 local_ip = get_local_ip()
@@ -1516,13 +1597,14 @@ def configure_servers_traditional(current_config, default_port,
         "SERVERS": servers
     }
 
-    # Write the configuration to file with pretty formatting (indent=4)
+    # Write the configuration to file with pretty formatting (indent=2, same as the admin panel)
+    # (skipped when nothing changed)
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(new_config, f, indent=4)
-        
-        # Display success message with all configured values
-        print(f"\n[SUCCESS] Configuration saved to '{CONFIG_FILE}'.")
+        if write_json_file(CONFIG_FILE, new_config):
+            # Display success message with all configured values
+            print(f"\n[SUCCESS] Configuration saved to '{CONFIG_FILE}'.")
+        else:
+            print(f"\n[INFO] Configuration unchanged, '{CONFIG_FILE}' left as is.")
         print(f"Port: {port}")
         print(f"\nConfigured Servers ({len(servers)}):")
         for idx, srv in enumerate(servers, 1):
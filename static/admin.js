@@ -0,0 +1,43 @@
+// Shared dark/light theme handling for the WOL Gateway admin panel
+function toggleTheme() {
+    const html = document.documentElement;
+    const currentTheme = html.getAttribute('data-theme');
+    const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
+    html.setAttribute('data-theme', newTheme);
+    localStorage.setItem('theme', newTheme);
+    updateThemeIcon();
+}
+function updateThemeIcon() {
+    const theme = document.documentElement.getAttribute('data-theme');
+    const toggle = document.querySelector('.theme-toggle i');
+    if (toggle) {
+        toggle.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
+    }
+}
+// The saved theme is applied by an inline script in base.html's <head>;
+// only the toggle icon needs updating once the page has loaded
+updateThemeIcon();
+// Show the PIN field only while "locked" is checked (server form)
+function togglePinField() {
+    const locked = document.getElementById('locked').checked;
+    const pinGroup = document.getElementById('pin-group');
+    pinGroup.style.display = locked ? 'block' : 'none';
+    if (!locked) {
+        document.getElementById('pin').value = '';
+    }
+}
+// Auto-submit 2FA codes once 6 digits are entered
+document.querySelectorAll('input[data-autosubmit]').forEach(function(input) {
+    input.addEventListener('input', function(e) {
+        if (e.target.value.length === 6) {
+            e.target.form.submit();
+        }
+    });
+});
+// Ask before submitting any form that carries a data-confirm message
+document.addEventListener('submit', function(e) {
+    const message = e.target.dataset.confirm;
+    if (message && !confirm(message)) {
+        e.preventDefault();
+    }
+});
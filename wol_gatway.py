@@ -24,6 +24,7 @@ import time
 import json
 import os
 import secrets
+import shutil
 import socket
 from datetime import datetime, timedelta
 from flask import Flask, redirect, Response, request, session
@@ -63,7 +64,7 @@ def load_config():
 
     # Load and parse the JSON configuration file
     try:
-        with open(CONFIG_FILE, 'r') as f:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
             user_config = json.load(f)
     except json.JSONDecodeError as e:
         raise ValueError(f"Error parsing {CONFIG_FILE}: {e}") from e
@@ -204,19 +205,54 @@ SERVERS = config["SERVERS"]
 # Initialize Flask application
 app = Flask(__name__)
 
-# Set session secret key for admin panel
-app.secret_key = os.environ.get('FLASK_SECRET_KEY', secrets.token_hex(32))
+# Set session secret key for admin panel (falls back to the key persisted
+# in admin_config.json below so sessions survive restarts)
+app.secret_key = os.environ.get('FLASK_SECRET_KEY')
 
 # Configure session to use cookies
 app.config['SESSION_TYPE'] = 'filesystem'
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = False  # Set to True if using HTTPS
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=1)
+# Templates only change on deploy; skip the per-render mtime check outside development
+app.config['TEMPLATES_AUTO_RELOAD'] = os.environ.get('FLASK_ENV') == 'development'
+
+# Optional: store sessions server-side in Redis (set REDIS_URL to enable)
+# Requires: pip install flask-session redis
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    try:
+        import redis
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.Redis.from_url(REDIS_URL)
+        # Like Flask's cookie sessions: browser-session cookies until login
+        # marks the session permanent
+        app.config['SESSION_PERMANENT'] = False
+        Session(app)
+        print(f"[{time.strftime('%H:%M:%S')}] Using Redis-backed sessions")
+    except ImportError:
+        print(f"[{time.strftime('%H:%M:%S')}] REDIS_URL is set but flask-session/redis are not installed, using cookie sessions")
+
+# Optional: compress HTML/CSS/JS responses with Brotli or gzip
+# Requires: pip install flask-compress
+try:
+    from flask_compress import Compress
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    # Streamed pages (dashboard, users) use a separate list that defaults to zstd first
+    app.config['COMPRESS_ALGORITHM_STREAMING'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 512
+    app.config['COMPRESS_LEVEL'] = 6
+    Compress(app)
+except ImportError:
+    pass
 
 # Import and register admin panel if enabled
 try:
     from admin_panel import admin_bp, load_admin_config
     admin_config = load_admin_config()
+    if not app.secret_key:
+        app.secret_key = admin_config.get('secret_key')
     if admin_config.get('admin_enabled', False):
         app.register_blueprint(admin_bp)
         print(f"[{time.strftime('%H:%M:%S')}] Admin panel enabled at /admin")
@@ -225,6 +261,10 @@ except ImportError:
 except Exception as e:
     print(f"[{time.strftime('%H:%M:%S')}] Error loading admin panel: {e}")
 
+# Last resort: a per-process key (sessions reset on restart)
+if not app.secret_key:
+    app.secret_key = secrets.token_hex(32)
+
 # =================================================================
 #                    SERVER UNLOCK TRACKING
 # =================================================================
@@ -749,10 +789,9 @@ def find_wakeonlan_command():
     # Try each path
     for cmd_path in possible_paths:
         try:
-            # Check if it's just a command name (try 'which')
+            # Check if it's just a command name (search PATH)
             if '/' not in cmd_path:
-                result = subprocess.run(['which', cmd_path], capture_output=True, text=True)
-                if result.returncode == 0:
+                if shutil.which(cmd_path):
                     return cmd_path
             # Check if it's a full path that exists
             elif os.path.isfile(cmd_path) and os.access(cmd_path, os.X_OK):
@@ -773,7 +812,7 @@ def log_startup_time(server_id, startup_seconds):
     """
     try:
         # Load current config
-        with open(CONFIG_FILE, 'r') as f:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
             config = json.load(f)
         
         servers = config.get('SERVERS', [])
@@ -797,8 +836,8 @@ def log_startup_time(server_id, startup_seconds):
         avg_time = sum(server['startup_times']) // len(server['startup_times'])
         
         # Save updated config
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
         
         print(f"[{time.strftime('%H:%M:%S')}] Server '{server['NAME']}' startup time: {startup_seconds}s (avg: {avg_time}s)")
         
@@ -947,8 +986,11 @@ def wake_server_and_redirect(server_id):
         # Execute: wakeonlan -i <BROADCAST_ADDRESS> <MAC_ADDRESS>
         # -i flag specifies the broadcast address to send the packet to
         # check=True: raises CalledProcessError if command fails
-        # capture_output=True: captures stdout/stderr for error reporting
-        subprocess.run([wakeonlan_cmd, '-i', broadcast_address, mac_address], check=True, capture_output=True)
+        # stdout=DEVNULL: the command's normal output is discarded
+        # stderr=PIPE: only stderr is captured, for error reporting
+        # stdin=DEVNULL: the command never waits for input
+        subprocess.run([wakeonlan_cmd, '-i', broadcast_address, mac_address], check=True,
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         print(f"[{time.strftime('%H:%M:%S')}] WOL packet sent to '{server_name}' ({mac_address}) via {broadcast_address} using {wakeonlan_cmd}")
     
     except subprocess.CalledProcessError as e: